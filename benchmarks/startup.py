@@ -0,0 +1,97 @@
+"""Measures cold start: time from spawning `main.py` to its `initialize` response.
+
+Every MCP client session spawns a fresh stdio server, so this latency is paid
+on each session start. Run it from the project root:
+
+    python benchmarks/startup.py --runs 10 --max-ms 1500
+
+With --max-ms the script exits non-zero when the median exceeds the budget,
+so it can gate CI against cold-start regressions.
+"""
+import argparse
+import json
+import os
+import selectors
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+INITIALIZE = {
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "initialize",
+    "params": {
+        "protocolVersion": "2025-03-26",
+        "capabilities": {},
+        "clientInfo": {"name": "startup-benchmark", "version": "0.1.0"},
+    },
+}
+
+
+def _replies(process: subprocess.Popen, deadline: float):
+    """Yields JSON messages from the server's stdout until `deadline`, skipping other output."""
+    buffer = b""
+    with selectors.DefaultSelector() as selector:
+        selector.register(process.stdout, selectors.EVENT_READ)
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0 or not selector.select(remaining):
+                raise TimeoutError("Server did not answer initialize in time")
+            chunk = os.read(process.stdout.fileno(), 65536)
+            if not chunk:
+                raise RuntimeError("Server exited without answering initialize")
+            *lines, buffer = (buffer + chunk).split(b"\n")
+            for line in lines:
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(message, dict):
+                    yield message
+
+
+def measure_once(python: str, timeout: float) -> float:
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [python, "main.py"],
+        cwd=ROOT,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL)
+    try:
+        process.stdin.write(json.dumps(INITIALIZE).encode() + b"\n")
+        process.stdin.flush()
+        for message in _replies(process, start + timeout):
+            if message.get("id") == INITIALIZE["id"]:
+                return time.perf_counter() - start
+    finally:
+        process.kill()
+        process.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--python", default=sys.executable)
+    parser.add_argument("--max-ms", type=float, default=None, help="fail if the median exceeds this")
+    parser.add_argument("--timeout", type=float, default=30.0, help="seconds to wait for each run")
+    args = parser.parse_args()
+
+    try:
+        measure_once(args.python, args.timeout)  # warm the bytecode and OS file caches
+        samples = [measure_once(args.python, args.timeout) * 1000 for _ in range(args.runs)]
+    except (TimeoutError, RuntimeError) as e:
+        sys.exit(str(e))
+    median = statistics.median(samples)
+    print(f"spawn-to-initialize over {args.runs} runs: "
+          f"min {min(samples):.1f} ms, median {median:.1f} ms, max {max(samples):.1f} ms")
+    if args.max_ms is not None and median > args.max_ms:
+        sys.exit(f"median {median:.1f} ms exceeds budget of {args.max_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
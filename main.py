@@ -1,3 +1,8 @@
+from dotenv import load_dotenv
+
+# Load .env once, before the tool modules read their configuration.
+load_dotenv()
+
 from mcp.server.fastmcp import FastMCP
 from tools.tools import register_tools
 
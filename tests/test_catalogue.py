@@ -0,0 +1,147 @@
+import asyncio
+import random
+import unittest
+
+from utils.catalogue import RANKING_PAGE_SIZE, AnimeCatalogue, CatalogueIndex
+from utils.models import Anime, decode_anime_page
+from utils.schemas import AnimeAiringStatus, AnimeMediaType, AnimeRanking, CatalogueSort
+
+GENRES = [{"id": i, "name": name} for i, name in enumerate(
+    ["Action", "Mystery", "Drama", "Comedy", "Romance", "Sci-Fi", "Horror", "Sports"], 1)]
+
+
+def make_catalogue(size: int = 3000, seed: int = 5) -> list:
+    rng = random.Random(seed)
+    anime = [{
+        "id": i,
+        "title": f"Anime {i}",
+        "mean": round(rng.uniform(5, 9.2), 2),
+        "num_list_users": rng.randint(100, 3_000_000),
+        "media_type": rng.choice(["tv", "movie", "ova", "ona"]),
+        "status": rng.choice(["finished_airing", "currently_airing"]),
+        "num_episodes": rng.choice([0, 1, 12, 13, 24, 26, 50]),
+        "genres": rng.sample(GENRES, 3),
+    } for i in range(1, size + 1)]
+    for popularity, item in enumerate(sorted(anime, key=lambda a: -a["num_list_users"]), 1):
+        item["popularity"] = popularity
+    return anime
+
+
+class FakeRanking:
+    """Serves ranking pages like MAL, sharing one decoded page per offset like Coalesce/the cache do."""
+
+    def __init__(self, anime: list):
+        self.sources = {
+            AnimeRanking.ALL: sorted(anime, key=lambda a: (-a["mean"], a["id"])),
+            AnimeRanking.BYPOPULARITY: sorted(anime, key=lambda a: a["popularity"]),
+        }
+        self.offsets = []
+        self._pages = {}
+
+    async def __call__(self, ranking_type: AnimeRanking, offset: int, limit: int):
+        self.offsets.append(offset)
+        await asyncio.sleep(0)
+        key = (ranking_type, offset, limit)
+        if key not in self._pages:
+            source = self.sources[ranking_type]
+            nodes = source[offset:offset + limit]
+            paging = {"next": "more"} if offset + limit < len(source) else {}
+            self._pages[key] = decode_anime_page({"data": [{"node": n} for n in nodes], "paging": paging})
+        return self._pages[key]
+
+
+def brute_force(anime: list, genres=(), min_mean=None, limit=10) -> list:
+    matches = [a for a in sorted(anime, key=lambda a: -a["mean"])
+               if all(g in [x["name"] for x in a["genres"]] for g in genres)
+               and (min_mean is None or a["mean"] >= min_mean)]
+    return [a["id"] for a in matches[:limit]]
+
+
+class CatalogueIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = CatalogueIndex()
+        for item in make_catalogue(200):
+            self.index.upsert(Anime.from_dict(item))
+        self.anime = {item["id"]: item for item in make_catalogue(200)}
+
+    def ids(self, rows):
+        return [self.index.ids[row] for row in rows]
+
+    def test_genres_are_intersected_and_categories_unioned(self):
+        mystery, drama = self.index.genre_by_name["mystery"], self.index.genre_by_name["drama"]
+        rows = self.index.query(genres=[mystery, drama], media_types=[AnimeMediaType.TV, AnimeMediaType.MOVIE],
+                                statuses=[AnimeAiringStatus.FINISHED], limit=200)
+        expected = {i for i, a in self.anime.items()
+                    if {"Mystery", "Drama"} <= {g["name"] for g in a["genres"]}
+                    and a["media_type"] in ("tv", "movie") and a["status"] == "finished_airing"}
+        self.assertEqual(set(self.ids(rows)), expected)
+
+    def test_results_are_ordered_and_bounded(self):
+        rows = self.index.query(min_mean=6.0, max_mean=8.0, max_episodes=13, limit=500)
+        means = [self.index.means[row] for row in rows]
+        self.assertEqual(means, sorted(means, reverse=True))
+        self.assertTrue(all(6.0 <= m <= 8.0 for m in means))
+        self.assertTrue(all(0 < self.index.num_episodes[row] <= 13 for row in rows))
+        rows = self.index.query(sort_by=CatalogueSort.POPULARITY, limit=5)
+        self.assertEqual([self.index.popularity[row] for row in rows], [1, 2, 3, 4, 5])
+
+    def test_upsert_moves_category_bits_and_keeps_missing_attributes(self):
+        row = self.index.row[1]
+        old_type = self.index._media_type_of[row]
+        new_type = AnimeMediaType.MUSIC if old_type is not AnimeMediaType.MUSIC else AnimeMediaType.TV
+        self.index.upsert(Anime.from_dict({"id": 1, "media_type": new_type.value}))
+        self.assertFalse(self.index.media_type_bits[old_type] >> row & 1)
+        self.assertTrue(self.index.media_type_bits[new_type] >> row & 1)
+        self.assertEqual(self.index.means[row], self.anime[1]["mean"])
+        self.assertEqual(self.index.titles[row], self.anime[1]["title"])
+
+
+class AnimeCatalogueTest(unittest.TestCase):
+    def setUp(self):
+        self.anime = make_catalogue()
+        self.ranking = FakeRanking(self.anime)
+        self.catalogue = AnimeCatalogue(CatalogueIndex(), self.ranking)
+
+    def query(self, **kwargs):
+        kwargs.setdefault("max_pages", 10)
+        kwargs.setdefault("sort_by", CatalogueSort.MEAN)
+        kwargs.setdefault("limit", 10)
+        return asyncio.run(self.catalogue.query(**kwargs))
+
+    def test_covered_query_matches_brute_force_and_is_reused(self):
+        result = self.query(genre_names=["Mystery"], min_mean=8.0, limit=50)
+        self.assertTrue(result["covered"])
+        self.assertEqual([d["id"] for d in result["data"]], brute_force(self.anime, ["Mystery"], 8.0, 50))
+        fetched = len(self.ranking.offsets)
+        result = self.query(genre_names=["mystery", "drama"], min_mean=8.5, limit=5)
+        self.assertTrue(result["covered"])
+        self.assertEqual(result["upstream_pages"], 0)
+        self.assertEqual(len(self.ranking.offsets), fetched)
+
+    def test_concurrent_queries_do_not_skip_pages(self):
+        async def both():
+            return await asyncio.gather(
+                self.catalogue.query(2, CatalogueSort.MEAN, 10, min_mean=7.0),
+                self.catalogue.query(2, CatalogueSort.MEAN, 10, min_mean=7.0))
+        asyncio.run(both())
+        coverage = self.catalogue.coverage[CatalogueSort.MEAN]
+        self.assertEqual(coverage.next_offset, len(set(self.ranking.offsets)) * RANKING_PAGE_SIZE)
+        result = self.query(min_mean=5.6, limit=3000)
+        self.assertTrue(result["covered"])
+        self.assertEqual(sorted(d["id"] for d in result["data"]), sorted(brute_force(self.anime, min_mean=5.6, limit=3000)))
+
+    def test_ranking_pages_are_indexed_without_the_middleware(self):
+        result = self.query(sort_by=CatalogueSort.POPULARITY, limit=400)
+        self.assertTrue(result["covered"])
+        self.assertEqual([d["popularity"] for d in result["data"]], list(range(1, 401)))
+
+    def test_empty_results_and_unknown_genres(self):
+        result = self.query(limit=0, statuses=["nope"], max_pages=1)
+        self.assertEqual(result["data"], [])
+        result = self.query(genre_names=["Isekai"], max_pages=1)
+        self.assertIn("Unknown genres: Isekai", result["error"])
+        self.assertIn("Mystery", result["known_genres"])
+
+
+if __name__ == "__main__":
+    unittest.main()
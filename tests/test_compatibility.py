@@ -0,0 +1,44 @@
+import unittest
+
+from utils.compatibility import ListIndex, compare_lists
+from utils.models import decode_anime_page
+
+
+def entries(*rows) -> list:
+    return decode_anime_page({"data": [
+        {"node": {"id": anime_id, "title": f"Anime {anime_id}"}, "list_status": {"status": status, "score": score}}
+        for anime_id, status, score in rows]}).data
+
+
+class CompareListsTest(unittest.TestCase):
+    def setUp(self):
+        self.a = ListIndex(entries(
+            (1, "completed", 10), (2, "completed", 8), (3, "completed", 6),
+            (4, "completed", 9), (5, "completed", 9), (6, "dropped", 0)))
+        self.b = ListIndex(entries(
+            (1, "completed", 9), (2, "completed", 7), (3, "completed", 5),
+            (5, "plan_to_watch", 0), (7, "watching", 0)))
+
+    def test_join_overlap_and_correlation(self):
+        result = compare_lists("a", self.a, "b", self.b)
+        self.assertEqual(result["shared"], 4)
+        self.assertEqual(result["jaccard"], round(4 / 7, 4))
+        self.assertEqual(result["shared_scored"], 3)
+        self.assertEqual(result["score_correlation"], 1.0)
+        self.assertEqual(result["mean_absolute_difference"], 1.0)
+        self.assertEqual(result["user_a"]["entries"], 6)
+        self.assertEqual(result["user_a"]["scored"], 5)
+
+    def test_suggests_absent_and_planned_titles_best_first(self):
+        suggestions = compare_lists("a", self.a, "b", self.b, min_score=9)["suggestions"]
+        self.assertEqual([(s["id"], s["planned_by_b"]) for s in suggestions], [(4, False), (5, True)])
+        suggestions = compare_lists("a", self.a, "b", self.b, min_score=9, limit=1)["suggestions"]
+        self.assertEqual([s["id"] for s in suggestions], [4])
+
+    def test_correlation_is_none_without_score_variance(self):
+        flat = ListIndex(entries((1, "completed", 7), (2, "completed", 7)))
+        self.assertIsNone(compare_lists("a", self.a, "flat", flat)["score_correlation"])
+
+
+if __name__ == "__main__":
+    unittest.main()
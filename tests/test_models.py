@@ -0,0 +1,20 @@
+import unittest
+
+from utils.models import Anime, Manga, to_dict
+
+
+class GenreTest(unittest.TestCase):
+    def test_anime_and_manga_genres_with_the_same_id_keep_their_names(self):
+        manga = Manga.from_dict({"id": 1, "genres": [{"id": 41, "name": "Seinen"}]})
+        anime = Anime.from_dict({"id": 1, "genres": [{"id": 41, "name": "Suspense"}]})
+        self.assertEqual(to_dict(manga)["genres"], [{"id": 41, "name": "Seinen"}])
+        self.assertEqual(to_dict(anime)["genres"], [{"id": 41, "name": "Suspense"}])
+
+    def test_equal_genres_are_shared(self):
+        a = Anime.from_dict({"id": 1, "genres": [{"id": 7, "name": "Mystery"}]})
+        b = Anime.from_dict({"id": 2, "genres": [{"id": 7, "name": "Mystery"}]})
+        self.assertIs(a.genres[0], b.genres[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+import asyncio
+import time
+import unittest
+from unittest import mock
+
+import httpx
+
+from tools.endpoints import ENDPOINTS
+from utils.pipeline import Coalesce, Endpoint, Pipeline, RateLimit, ResponseCache, Retry, build_call
+
+DETAILS = Endpoint("details", "GET", "/anime/{anime_id}", ttl=60, defaults={"fields": "id,title"})
+
+
+def status_error(status: int, headers: dict = None) -> httpx.HTTPStatusError:
+    request = httpx.Request("GET", "https://example.invalid")
+    response = httpx.Response(status, headers=headers, request=request)
+    return httpx.HTTPStatusError(f"{status}", request=request, response=response)
+
+
+class BuildCallTest(unittest.TestCase):
+    def test_empty_query_values_fall_back_to_defaults(self):
+        call = build_call(DETAILS, {"anime_id": 1, "fields": []})
+        self.assertEqual(call.path, "/anime/1")
+        self.assertEqual(call.params, {"fields": "id,title"})
+
+    def test_empty_body_values_are_sent(self):
+        call = build_call(ENDPOINTS["update_myanimelist"], {"anime_id": 1, "comments": "", "tags": ""})
+        self.assertEqual(call.data, {"comments": "", "tags": ""})
+
+
+class CoalesceTest(unittest.TestCase):
+    def test_followers_get_the_result_when_the_leader_is_cancelled(self):
+        upstream = []
+
+        async def transport(call):
+            upstream.append(call.path)
+            await asyncio.sleep(0.05)
+            return "result"
+
+        async def run():
+            pipeline = Pipeline([Coalesce()], transport)
+            leader = asyncio.create_task(pipeline(DETAILS, anime_id=1))
+            await asyncio.sleep(0.01)
+            follower = asyncio.create_task(pipeline(DETAILS, anime_id=1))
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            return await follower, leader.cancelled()
+
+        self.assertEqual(asyncio.run(run()), ("result", True))
+        self.assertEqual(upstream, ["/anime/1"])
+
+    def test_request_is_cancelled_once_nobody_waits(self):
+        cancelled = []
+
+        async def transport(call):
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                cancelled.append(call.path)
+                raise
+
+        async def run():
+            coalesce = Coalesce()
+            caller = asyncio.create_task(Pipeline([coalesce], transport)(DETAILS, anime_id=1))
+            await asyncio.sleep(0.01)
+            caller.cancel()
+            await asyncio.sleep(0.01)
+            return coalesce._inflight
+
+        self.assertEqual(asyncio.run(run()), {})
+        self.assertEqual(cancelled, ["/anime/1"])
+
+
+class RetryTest(unittest.TestCase):
+    def run_with(self, failures, retry=None):
+        failures = list(failures)
+        delays = []
+
+        async def transport(call):
+            if failures:
+                raise failures.pop(0)
+            return "ok"
+
+        async def sleep(delay):
+            delays.append(delay)
+
+        with mock.patch("utils.pipeline.asyncio.sleep", sleep):
+            result = asyncio.run(Pipeline([retry or Retry(attempts=3, backoff=0.5)], transport)(DETAILS, anime_id=1))
+        return result, delays
+
+    def test_retries_429_and_503_honouring_retry_after(self):
+        result, delays = self.run_with([status_error(429, {"Retry-After": "7"}), status_error(503)])
+        self.assertEqual(result, "ok")
+        self.assertEqual(delays, [7.0, 1.0])
+
+    def test_client_errors_and_exhausted_attempts_are_raised(self):
+        with self.assertRaises(httpx.HTTPStatusError):
+            self.run_with([status_error(404)])
+        with self.assertRaises(httpx.HTTPStatusError):
+            self.run_with([status_error(503)] * 2, Retry(attempts=2, backoff=0))
+
+
+class RateLimitTest(unittest.TestCase):
+    def test_requests_beyond_the_burst_wait_for_tokens(self):
+        async def run():
+            limiter = RateLimit(rate=20, burst=2)
+            start = time.monotonic()
+            for _ in range(4):
+                await limiter.acquire()
+            return time.monotonic() - start
+
+        self.assertGreaterEqual(asyncio.run(run()), 0.09)
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def test_writes_invalidate_cached_reads(self):
+        upstream = []
+
+        async def transport(call):
+            upstream.append(call.endpoint.name)
+            return {"n": len(upstream)}
+
+        async def run():
+            pipeline = Pipeline([ResponseCache()], transport)
+            first = await pipeline(ENDPOINTS["get_anime_list"], username="someone")
+            cached = await pipeline(ENDPOINTS["get_anime_list"], username="someone")
+            await pipeline(ENDPOINTS["update_myanimelist"], anime_id=1, score=9)
+            fresh = await pipeline(ENDPOINTS["get_anime_list"], username="someone")
+            return first, cached, fresh
+
+        first, cached, fresh = asyncio.run(run())
+        self.assertEqual(first, cached)
+        self.assertNotEqual(first, fresh)
+        self.assertEqual(upstream, ["get_anime_list", "update_myanimelist", "get_anime_list"])
+
+
+if __name__ == "__main__":
+    unittest.main()
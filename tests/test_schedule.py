@@ -0,0 +1,68 @@
+import datetime
+import unittest
+from zoneinfo import ZoneInfo
+
+from utils.models import Anime
+from utils.schedule import ScheduleIndex
+from utils.schemas import Weekday
+
+UTC_MINUS_4 = datetime.timezone(datetime.timedelta(hours=-4))
+TOKYO = ZoneInfo("Asia/Tokyo")
+NOW = datetime.datetime(2026, 10, 19, 12, 0, tzinfo=datetime.timezone.utc)  # a Monday
+
+
+def show(anime_id: int, day: str, start_time: str) -> Anime:
+    return Anime.from_dict({
+        "id": anime_id,
+        "title": f"{day} {start_time}",
+        "status": "currently_airing",
+        "broadcast": {"day_of_the_week": day, "start_time": start_time},
+    })
+
+
+def slots(results: list) -> list:
+    return [(r["day_of_the_week"], r["start_time"]) for r in results]
+
+
+class ScheduleIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = ScheduleIndex()
+        self.index.update({s.id: s for s in [
+            show(1, "sunday", "23:30"), show(2, "monday", "00:10"), show(3, "sunday", "22:00"),
+            show(4, "saturday", "12:00"), show(5, "monday", "09:30"),
+        ]})
+
+    def query(self, days, start, end, tz, now=NOW):
+        return slots(self.index.query(days, start, end, tz, now=now))
+
+    def test_between_wraps_past_sunday_night(self):
+        sunday_2330 = 6 * 24 * 60 + 23 * 60 + 30
+        self.assertEqual([anime_id for _, anime_id in self.index.between(sunday_2330, sunday_2330 + 60)], [1, 2])
+
+    def test_overnight_window_is_ordered_by_time(self):
+        self.assertEqual(self.query([Weekday.SUNDAY], 22 * 60, 2 * 60, TOKYO),
+                         [("sunday", "22:00"), ("sunday", "23:30"), ("monday", "00:10")])
+
+    def test_window_wrapping_the_week_after_the_timezone_shift(self):
+        # Saturday 12:00 JST is Friday 23:00 at UTC-4.
+        self.assertEqual(self.query([Weekday.FRIDAY], 22 * 60, 23 * 60 + 59, UTC_MINUS_4), [("friday", "23:00")])
+        # Sunday 19:00-21:00 at UTC-4 is Monday 08:00-10:00 JST, past the end of the JST week.
+        self.assertEqual(self.query([Weekday.SUNDAY], 19 * 60, 21 * 60, UTC_MINUS_4), [("sunday", "20:30")])
+
+    def test_offset_follows_dst_on_the_queried_day(self):
+        # New York leaves DST on Sunday 2026-11-01; asked on the Friday before.
+        new_york = ZoneInfo("America/New_York")
+        friday = datetime.datetime(2026, 10, 30, 16, 0, tzinfo=datetime.timezone.utc)
+        self.assertEqual(self.query([Weekday.FRIDAY], 22 * 60, 23 * 60 + 59, new_york, friday), [("friday", "23:00")])
+        self.assertEqual(self.query([Weekday.SUNDAY], 19 * 60, 21 * 60, new_york, friday), [("sunday", "19:30")])
+
+    def test_update_moves_a_show_to_its_new_slot(self):
+        changed = self.index.update({**self.index.shows, 4: show(4, "tuesday", "18:00")})
+        self.assertEqual(changed, 1)
+        self.assertEqual(len(self.index), 5)
+        self.assertEqual(self.query([Weekday.SATURDAY], 11 * 60, 13 * 60, TOKYO), [])
+        self.assertEqual(self.query([Weekday.TUESDAY], 17 * 60, 19 * 60, TOKYO), [("tuesday", "18:00")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import os
+from typing import Any
+from utils.catalogue import CatalogueIndex, IndexResponses
+from utils.models import Anime, Manga, decode_anime_page, decode_manga_page, to_dict
+from utils.pipeline import (
+    Authenticate, Call, Coalesce, Endpoint, Metrics, Pipeline, RateLimit,
+    ResponseCache, Retry, Transport, map_errors, project,
+)
+
+MAL_API_URL = "https://api.myanimelist.net/v2"
+
+DEFAULT_FIELDS = "id,title,main_picture"
+ANIME_LIST_WRITES = ("get_anime_list", "get_anime_details", "get_suggested_anime", "get_user_profile")
+MANGA_LIST_WRITES = ("get_manga_list", "get_manga_details", "get_user_profile")
+
+
+def _deleted(kind: str, id_arg: str):
+    def project_deleted(call: Call, result: Any) -> dict:
+        return {"message": f"{kind} ID {call.args[id_arg]} deleted successfully"}
+    return project_deleted
+
+
+async def _access_token() -> str:
+    # utils.auth pulls in the OAuth callback server and browser helpers, so it
+    # is only imported once an authenticated tool is actually used.
+    from utils.auth import get_mal_access_token
+    return await get_mal_access_token()
+
+
+def _response_cache(cache: ResponseCache):
+    cache_socket = os.getenv("MAL_CACHE_SOCKET")
+    if not cache_socket:
+        return cache
+    from utils.shared_cache import SharedCache
+    return SharedCache(cache_socket, cache)
+
+
+ENDPOINTS = {endpoint.name: endpoint for endpoint in [
+    # Anime
+    Endpoint("get_anime", "GET", "/anime", ttl=600, model=decode_anime_page),
+    Endpoint("get_anime_details", "GET", "/anime/{anime_id}", ttl=3600, defaults={"fields": DEFAULT_FIELDS},
+             model=Anime.from_dict),
+    Endpoint("get_anime_ranking", "GET", "/anime/ranking/{ranking_type}", ttl=3600, model=decode_anime_page),
+    Endpoint("get_seasonal_anime", "GET", "/anime/season/{year}/{season}", ttl=3600, model=decode_anime_page),
+    Endpoint("get_anime_list", "GET", "/users/{username}/animelist", ttl=300, model=decode_anime_page),
+    # Manga
+    Endpoint("get_manga", "GET", "/manga", ttl=600, model=decode_manga_page),
+    Endpoint("get_manga_details", "GET", "/manga/{manga_id}", ttl=3600, defaults={"fields": DEFAULT_FIELDS},
+             model=Manga.from_dict),
+    Endpoint("get_manga_ranking", "GET", "/manga/ranking/{ranking_type}", ttl=3600, model=decode_manga_page),
+    Endpoint("get_manga_list", "GET", "/users/{username}/mangalist", ttl=300, model=decode_manga_page),
+    # User (OAuth2)
+    Endpoint("get_suggested_anime", "GET", "/anime/suggestions", auth=True, model=decode_anime_page),
+    Endpoint("get_user_profile", "GET", "/users/@me", auth=True),
+    Endpoint("delete_myanimelist_item", "DELETE", "/anime/{anime_id}/my_list_status", auth=True,
+             invalidates=ANIME_LIST_WRITES, project=_deleted("Anime", "anime_id")),
+    Endpoint("delete_mymangalist_item", "DELETE", "/manga/{manga_id}/my_list_status", auth=True,
+             invalidates=MANGA_LIST_WRITES, project=_deleted("Manga", "manga_id")),
+    Endpoint("update_myanimelist", "PUT", "/anime/{anime_id}/my_list_status", auth=True,
+             invalidates=ANIME_LIST_WRITES),
+    Endpoint("update_mymangalist", "PUT", "/manga/{manga_id}/my_list_status", auth=True,
+             invalidates=MANGA_LIST_WRITES),
+]}
+
+metrics = Metrics()
+cache = ResponseCache(maxsize=2048)
+catalogue_index = CatalogueIndex()
+
+# Order matters: errors are mapped last so every middleware sees exceptions,
+# the catalogue only indexes fresh upstream results (AnimeCatalogue indexes the
+# ranking pages it relies on itself), and the rate limiter sits inside the
+# retry loop so retries are throttled too.
+pipeline = Pipeline(
+    [
+        map_errors,
+        metrics,
+        project,
+        _response_cache(cache),
+        Coalesce(),
+        IndexResponses(catalogue_index),
+        Authenticate(os.getenv("MAL_CLIENT_ID"), _access_token),
+        Retry(attempts=3, backoff=0.5),
+        RateLimit(rate=5.0, burst=10),
+    ],
+    Transport(MAL_API_URL))
+
+
+def is_error(result: Any) -> bool:
+    return isinstance(result, dict) and "error" in result
+
+
+async def fetch(name: str, **args: Any) -> Any:
+    """Runs an endpoint and returns typed models, for in-process consumers."""
+    return await pipeline(ENDPOINTS[name], **args)
+
+
+async def call_endpoint(name: str, **args: Any) -> Any:
+    return to_dict(await fetch(name, **args))
+
+
+async def fetch_paginated(name: str, page_size: int, **args: Any) -> Any:
+    """Follows offset paging to the end and returns every Entry, or the first error."""
+    entries = []
+    offset = 0
+    while True:
+        page = await fetch(name, limit=page_size, offset=offset, **args)
+        if is_error(page):
+            return page
+        entries.extend(page.data or ())
+        if not (page.paging or {}).get("next"):
+            return entries
+        offset += page_size
@@ -1,15 +1,32 @@
-import httpx
+import asyncio
+import datetime
 from typing import Optional, List, Annotated
-from pydantic import Field, ValidationError
+from zoneinfo import ZoneInfo
+from pydantic import Field
 from mcp.server.fastmcp import FastMCP
 from utils.schemas import *
-from dotenv import load_dotenv
-import os
-from utils.auth import get_mal_access_token
+from utils.compatibility import ListIndex, compare_lists
+from utils.schedule import WEEKDAYS, AiringSchedule, parse_time
+from utils.catalogue import CATALOGUE_FIELDS, MAX_RANKING_PAGES, AnimeCatalogue
+from tools.endpoints import call_endpoint, catalogue_index, fetch, fetch_paginated, is_error, metrics
 
-load_dotenv()
+LIST_PAGE_SIZE = 1000
+SEASON_PAGE_SIZE = 500
+SCHEDULE_FIELDS = "broadcast,num_episodes,start_date,status,media_type"
 
-MAL_API_URL = "https://api.myanimelist.net/v2"
+
+async def _fetch_season(year: int, season: Season):
+    return await fetch_paginated("get_seasonal_anime", SEASON_PAGE_SIZE, year=year, season=season,
+                                 fields=SCHEDULE_FIELDS, nsfw=True)
+
+airing_schedule = AiringSchedule(_fetch_season)
+
+
+async def _fetch_ranking(ranking_type: AnimeRanking, offset: int, limit: int):
+    return await fetch("get_anime_ranking", ranking_type=ranking_type, limit=limit, offset=offset,
+                       fields=CATALOGUE_FIELDS, nsfw=True)
+
+anime_catalogue = AnimeCatalogue(catalogue_index, _fetch_ranking)
 
 def register_tools(mcp: FastMCP):
 
@@ -24,21 +41,7 @@ def register_tools(mcp: FastMCP):
             limit (int): The number of results to return (default is 10 and max 100).
             offset (int): The offset for pagination (default is 0).
         """
-        try:
-            CLIENT_ID = os.getenv("MAL_CLIENT_ID")
-            async with httpx.AsyncClient() as client:
-                headers = {"X-MAL-CLIENT-ID": f"{CLIENT_ID}"}
-                params = {"q": q, "limit": limit, "offset": offset}
-                response = await client.get(
-                    f"{MAL_API_URL}/anime",
-                    headers=headers,
-                    params=params)
-                response.raise_for_status()
-                return response.json()
-        except httpx.HTTPStatusError as e:
-            return {"error": str(e), "status_code": e.response.status_code}
-        except Exception as e:
-            return {"error": str(e)}
+        return await call_endpoint("get_anime", q=q, limit=limit, offset=offset)
 
     @mcp.tool()
     async def get_anime_details(anime_id: int, fields: Optional[List[str]]) -> dict:
@@ -60,24 +63,8 @@ def register_tools(mcp: FastMCP):
         - To get similar animes: get_anime_details(30230, fields=["recommendations"])
         - To get genres and synopsis: get_anime_details(30230, fields=["genres", "synopsis"])
         """
-        try:
-            CLIENT_ID = os.getenv("MAL_CLIENT_ID")
-            default_fields = ["id", "title", "main_picture"]
-            selected_fields = fields if fields else default_fields
-            fields_param = ",".join(selected_fields)
-
-            async with httpx.AsyncClient() as client:
-                headers = {"X-MAL-CLIENT-ID": f"{CLIENT_ID}"}
-                response = await client.get(
-                    f"{MAL_API_URL}/anime/{anime_id}?fields={fields_param}",
-                    headers=headers)
-                response.raise_for_status()
-                return response.json()
-        except httpx.HTTPStatusError as e:
-            return {"error": str(e), "status_code": e.response.status_code}
-        except Exception as e:
-            return {"error": str(e)}
-        
+        return await call_endpoint("get_anime_details", anime_id=anime_id, fields=fields)
+
     @mcp.tool()
     async def get_anime_ranking(ranking_type: AnimeRanking = AnimeRanking.ALL, limit: int = 10, offset: int = 0) -> dict:
         """
@@ -89,22 +76,8 @@ def register_tools(mcp: FastMCP):
             limit (int): The number of results to return (default is 10 and max 500).
             offset (int): The offset for pagination (default is 0).
         """
-        try:
-            CLIENT_ID = os.getenv("MAL_CLIENT_ID")
-            async with httpx.AsyncClient() as client:
-                headers = {"X-MAL-CLIENT-ID": f"{CLIENT_ID}"}
-                params = {"limit": limit, "offset": offset}
-                response = await client.get(
-                    f"{MAL_API_URL}/anime/ranking/{ranking_type.value}",
-                    headers=headers,
-                    params=params)
-                response.raise_for_status()
-                return response.json()
-        except httpx.HTTPStatusError as e:
-            return {"error": str(e), "status_code": e.response.status_code}
-        except Exception as e:
-            return {"error": str(e)}
-        
+        return await call_endpoint("get_anime_ranking", ranking_type=ranking_type, limit=limit, offset=offset)
+
     @mcp.tool()
     async def get_seasonal_anime(season: Season, year: int, sort: Optional[SeasonSort] = None, limit: int = 10, offset: int = 0) -> dict:
         """
@@ -117,24 +90,7 @@ def register_tools(mcp: FastMCP):
             limit (int): The number of results to return (default is 10 and max 500).
             offset (int): The offset for pagination (default is 0).
         """
-        try:
-            CLIENT_ID = os.getenv("MAL_CLIENT_ID")
-            async with httpx.AsyncClient() as client:
-                headers = {"X-MAL-CLIENT-ID": f"{CLIENT_ID}"}
-                params = {"limit": limit, "offset": offset}
-                if sort:
-                    params["sort"] = sort.value
-                response = await client.get(
-                    f"{MAL_API_URL}/anime/season/{year}/{season.value}",
-                    headers=headers,
-                    params=params)
-                response.raise_for_status()
-                return response.json()
-        except httpx.HTTPStatusError as e:
-            return {"error": str(e), "status_code": e.response.status_code}
-        except Exception as e:
-            return {"error": str(e)}
-        
+        return await call_endpoint("get_seasonal_anime", season=season, year=year, sort=sort, limit=limit, offset=offset)
 
     @mcp.tool()
     async def get_anime_list(username: str, status: AnimeStatus, sort: Optional[AnimeStatusSort] = None, limit: int = 10, offset: int = 0) -> dict:
@@ -148,23 +104,126 @@ def register_tools(mcp: FastMCP):
             limit (int): The number of results to return (default is 10 and max 500).
             offset (int): The offset for pagination (default is 0).
         """
+        return await call_endpoint("get_anime_list", username=username, status=status, sort=sort, limit=limit, offset=offset)
+
+    @mcp.tool()
+    async def compare_anime_lists(
+        username_a: str,
+        username_b: str,
+        min_score: Annotated[int, Field(ge=1, le=10)] = 8,
+        limit: Annotated[int, Field(ge=1, le=500)] = 20
+    ) -> dict:
+        """
+        Compares two users' anime lists (all statuses) and returns how compatible their tastes are,
+        plus what user B should watch from user A's list. Only the comparison is returned, not the lists.
+
+        Args:
+            username_a (str): The MyAnimeList user whose list suggestions are taken from.
+            username_b (str): The MyAnimeList user to compare against and suggest to.
+            min_score (int): Minimum score (1-10) from user A for a title to be suggested (default is 8).
+            limit (int): The maximum number of suggestions to return (default is 20 and max 500).
+
+        Returns shared titles, Jaccard overlap, Pearson correlation and mean absolute difference
+        of the scores both users gave, and suggestions ordered by user A's score.
+        """
+        list_a, list_b = await asyncio.gather(
+            fetch_paginated("get_anime_list", LIST_PAGE_SIZE, username=username_a, fields="list_status", nsfw=True),
+            fetch_paginated("get_anime_list", LIST_PAGE_SIZE, username=username_b, fields="list_status", nsfw=True))
+        for username, result in ((username_a, list_a), (username_b, list_b)):
+            if is_error(result):
+                return {**result, "username": username}
+        return compare_lists(
+            username_a, ListIndex(list_a),
+            username_b, ListIndex(list_b),
+            min_score=min_score, limit=limit)
+
+    @mcp.tool()
+    async def get_airing_schedule(
+        days: Optional[List[Weekday]] = None,
+        start_time: str = "00:00",
+        end_time: str = "23:59",
+        timezone: str = "Asia/Tokyo",
+        include_upcoming: bool = False
+    ) -> dict:
+        """
+        Returns the weekly airing schedule of the current and previous season's airing anime,
+        converted to the given timezone. Answers "what airs tonight / this week" in one call.
+
+        Args:
+            days (List[Weekday], optional): Weekdays to include, in the given timezone. Options:
+                "monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday". Default is all week.
+            start_time (str): Start of the time window as "HH:MM" (default is "00:00").
+            end_time (str): End of the time window as "HH:MM" (default is "23:59"). If it is earlier than
+                start_time the window runs past midnight, e.g. "22:00" to "02:00".
+            timezone (str): IANA timezone name such as "America/New_York" (default is "Asia/Tokyo").
+            include_upcoming (bool): Also include announced shows that have not started airing (default is False).
+
+        Examples:
+        - Tonight in New York: get_airing_schedule(days=["friday"], start_time="18:00", end_time="23:59", timezone="America/New_York")
+        """
         try:
-            CLIENT_ID = os.getenv("MAL_CLIENT_ID")
-            async with httpx.AsyncClient() as client:
-                headers = {"X-MAL-CLIENT-ID": f"{CLIENT_ID}"}
-                params = {"status": status.value, "limit": limit, "offset": offset}
-                if sort:
-                    params["sort"] = sort.value
-                response = await client.get(
-                    f"{MAL_API_URL}/users/{username}/animelist",
-                    headers=headers,
-                    params=params)
-                response.raise_for_status()
-                return response.json()
-        except httpx.HTTPStatusError as e:
-            return {"error": str(e), "status_code": e.response.status_code}
-        except Exception as e:
-            return {"error": str(e)}
+            tz = ZoneInfo(timezone)
+            start, end = parse_time(start_time), parse_time(end_time)
+        except (ValueError, KeyError) as e:
+            return {"error": f"Invalid schedule query: {str(e)}"}
+        error = await airing_schedule.ensure_ready()
+        if error:
+            return error
+        selected_days = [day for day in days if day in WEEKDAYS] if days else WEEKDAYS
+        return {
+            "data": airing_schedule.index.query(selected_days, start, end, tz, include_upcoming),
+            "timezone": timezone,
+            "refreshed_at": datetime.datetime.fromtimestamp(airing_schedule.refreshed_at, datetime.timezone.utc).isoformat(),
+        }
+
+    @mcp.tool()
+    async def query_anime_catalogue(
+        genres: Optional[List[str]] = None,
+        media_types: Optional[List[AnimeMediaType]] = None,
+        statuses: Optional[List[AnimeAiringStatus]] = None,
+        min_mean: Optional[float] = None,
+        max_mean: Optional[float] = None,
+        min_episodes: Optional[int] = None,
+        max_episodes: Optional[int] = None,
+        max_popularity: Optional[int] = None,
+        sort_by: CatalogueSort = CatalogueSort.MEAN,
+        limit: Annotated[int, Field(ge=1, le=1000)] = 10,
+        max_pages: Annotated[int, Field(ge=0, le=MAX_RANKING_PAGES)] = 4
+    ) -> dict:
+        """
+        Filters anime by genre, type, airing status, score, episode count and popularity, which the
+        MyAnimeList API can't do. Answered from a local index of previously fetched rankings, seasons
+        and details; ranking pages are only fetched when the index can't answer the query yet.
+
+        Args:
+            genres (List[str], optional): Genre names that must all match, e.g. ["Mystery", "Drama"].
+            media_types (List[AnimeMediaType], optional): Any of "tv", "ova", "movie", "special", "ona", "music", ...
+            statuses (List[AnimeAiringStatus], optional): Any of "finished_airing", "currently_airing", "not_yet_aired".
+            min_mean (float, optional): Minimum mean score.
+            max_mean (float, optional): Maximum mean score.
+            min_episodes (int, optional): Minimum number of episodes.
+            max_episodes (int, optional): Maximum number of episodes.
+            max_popularity (int, optional): Only anime ranked this popular or better (1 is the most popular).
+            sort_by (CatalogueSort): "mean" (highest first) or "popularity" (most popular first). Default is "mean".
+            limit (int): The number of results to return (default is 10 and max 1000).
+            max_pages (int): Maximum ranking pages of 500 to fetch if the index doesn't cover the query (default is 4, max 20).
+
+        Returns the matches plus "covered", which is true when the result is known to be complete.
+
+        Examples:
+        - Finished TV mysteries scored 8+ with at most 25 episodes:
+          query_anime_catalogue(genres=["Mystery"], media_types=["tv"], statuses=["finished_airing"], min_mean=8.0, max_episodes=25)
+        """
+        return await anime_catalogue.query(
+            max_pages, sort_by, limit,
+            genre_names=genres or (),
+            media_types=media_types or (),
+            statuses=statuses or (),
+            min_mean=min_mean,
+            max_mean=max_mean,
+            min_episodes=min_episodes,
+            max_episodes=max_episodes,
+            max_popularity=max_popularity)
 
 
     #Manga
@@ -178,22 +237,8 @@ def register_tools(mcp: FastMCP):
             limit (int): The number of results to return (default is 10 and max 100).
             offset (int): The offset for pagination (default is 0).
         """
-        try:
-            CLIENT_ID = os.getenv("MAL_CLIENT_ID")
-            async with httpx.AsyncClient() as client:
-                headers = {"X-MAL-CLIENT-ID": f"{CLIENT_ID}"}
-                params = {"q": q, "limit": limit, "offset": offset}
-                response = await client.get(
-                    f"{MAL_API_URL}/manga",
-                    headers=headers,
-                    params=params)
-                response.raise_for_status()
-                return response.json()
-        except httpx.HTTPStatusError as e:
-            return {"error": str(e), "status_code": e.response.status_code}
-        except Exception as e:
-            return {"error": str(e)}
-        
+        return await call_endpoint("get_manga", q=q, limit=limit, offset=offset)
+
     @mcp.tool()
     async def get_manga_details(manga_id: int, fields: Optional[List[str]]) -> dict:
         """
@@ -213,24 +258,8 @@ def register_tools(mcp: FastMCP):
         - To get similar mangas: get_manga_details(30230, fields=["recommendations"])
         - To get genres and synopsis: get_manga_details(30230, fields=["genres", "synopsis"])
         """
-        try:
-            CLIENT_ID = os.getenv("MAL_CLIENT_ID")
-            default_fields = ["id", "title", "main_picture"]
-            selected_fields = fields if fields else default_fields
-            fields_param = ",".join(selected_fields)
-
-            async with httpx.AsyncClient() as client:
-                headers = {"X-MAL-CLIENT-ID": f"{CLIENT_ID}"}
-                response = await client.get(
-                    f"{MAL_API_URL}/manga/{manga_id}?fields={fields_param}",
-                    headers=headers)
-                response.raise_for_status()
-                return response.json()
-        except httpx.HTTPStatusError as e:
-            return {"error": str(e), "status_code": e.response.status_code}
-        except Exception as e:
-            return {"error": str(e)}
-        
+        return await call_endpoint("get_manga_details", manga_id=manga_id, fields=fields)
+
     @mcp.tool()
     async def get_manga_ranking(ranking_type: MangaRanking, limit: int = 100, offset: int = 0) -> dict:
         """
@@ -242,22 +271,8 @@ def register_tools(mcp: FastMCP):
             limit (int): The number of results to return (default is 10 and max 500).
             offset (int): The offset for pagination (default is 0).
         """
-        try:
-            CLIENT_ID = os.getenv("MAL_CLIENT_ID")
-            async with httpx.AsyncClient() as client:
-                headers = {"X-MAL-CLIENT-ID": f"{CLIENT_ID}"}
-                params = {"limit": limit, "offset": offset}
-                response = await client.get(
-                    f"{MAL_API_URL}/manga/ranking/{ranking_type.value}",
-                    headers=headers,
-                    params=params)
-                response.raise_for_status()
-                return response.json()
-        except httpx.HTTPStatusError as e:
-            return {"error": str(e), "status_code": e.response.status_code}
-        except Exception as e:
-            return {"error": str(e)}
-        
+        return await call_endpoint("get_manga_ranking", ranking_type=ranking_type, limit=limit, offset=offset)
+
     @mcp.tool()
     async def get_manga_list(username: str, status: MangaStatus, sort: Optional[MangaStatusSort] = None, limit: int = 10, offset: int = 0) -> dict:
         """
@@ -270,27 +285,11 @@ def register_tools(mcp: FastMCP):
             limit (int): The number of results to return (default is 10 and max 500).
             offset (int): The offset for pagination (default is 0).
         """
-        try:
-            CLIENT_ID = os.getenv("MAL_CLIENT_ID")
-            async with httpx.AsyncClient() as client:
-                headers = {"X-MAL-CLIENT-ID": f"{CLIENT_ID}"}
-                params = {"status": status.value, "limit": limit, "offset": offset}
-                if sort:
-                    params["sort"] = sort.value
-                response = await client.get(
-                    f"{MAL_API_URL}/users/{username}/mangalist",
-                    headers=headers,
-                    params=params)
-                response.raise_for_status()
-                return response.json()
-        except httpx.HTTPStatusError as e:
-            return {"error": str(e), "status_code": e.response.status_code}
-        except Exception as e:
-            return {"error": str(e)}
+        return await call_endpoint("get_manga_list", username=username, status=status, sort=sort, limit=limit, offset=offset)
 
     # User
-    # NEEDS OAUTH2 AUTHENTICATION    
-    
+    # NEEDS OAUTH2 AUTHENTICATION
+
     @mcp.tool()
     async def get_suggested_anime(limit: int = 10, offset: int = 0) -> dict:
         """
@@ -300,25 +299,8 @@ def register_tools(mcp: FastMCP):
             limit (int): The number of results to return (default is 10 and max 100).
             offset (int): The offset for pagination (default is 0).
         """
-        try:
-            token = await get_mal_access_token()
-            if not token:
-                raise ValueError("No valid access token available")
-            headers = {"Authorization": f"Bearer {token}"}
-            params = {"limit": limit, "offset": offset}
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{MAL_API_URL}/anime/suggestions",
-                    headers = headers,
-                    params = params
-                )
-                response.raise_for_status()
-                return response.json()
-        except httpx.HTTPStatusError as e:
-            return {"error": str(e), "status_code": e.response.status_code}
-        except Exception as e:
-            return {"error": str(e)}
-        
+        return await call_endpoint("get_suggested_anime", limit=limit, offset=offset)
+
     @mcp.tool()
     async def get_user_profile(fields: Optional[str] = None) -> dict:
         """
@@ -327,27 +309,8 @@ def register_tools(mcp: FastMCP):
         Args:
             fields (str, optional): Set to "anime_statistics" to include anime statistics. Default is None.
         """
-        try:
-            token = await get_mal_access_token()
-            if not token:
-                raise ValueError("No valid access token available")
-            headers = {"Authorization": f"Bearer {token}"}
-            params = {}
-            if fields == "anime_statistics":
-                params["fields"] = "anime_statistics"
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{MAL_API_URL}/users/@me",
-                    headers=headers,
-                    params=params
-                )
-                response.raise_for_status()
-                return response.json()
-        except httpx.HTTPStatusError as e:
-            return {"error": str(e), "status_code": e.response.status_code}
-        except Exception as e:
-            return {"error": str(e)}
-    
+        return await call_endpoint("get_user_profile", fields="anime_statistics" if fields == "anime_statistics" else None)
+
     @mcp.tool()
     async def delete_myanimelist_item(anime_id: int) -> dict:
         """
@@ -356,25 +319,8 @@ def register_tools(mcp: FastMCP):
         Args:
             anime_id: The ID of the anime to delete.
         """
-        try:
-            token = await get_mal_access_token()
-            if not token:
-                raise ValueError("No valid access token available")
-            headers = {"Authorization": f"Bearer {token}"}
-            async with httpx.AsyncClient() as client:
-                response = await client.delete(
-                    f"https://api.myanimelist.net/v2/anime/{anime_id}/my_list_status",
-                    headers=headers
-                )
-                response.raise_for_status()
-                return {"message": f"Anime ID {anime_id} deleted successfully"}
-        except httpx.HTTPStatusError as e:
-            return {"error": str(e), "status_code": e.response.status_code, "response_text": e.response.text}
-        except ValueError as e:
-            return {"error": str(e)}
-        except Exception as e:
-            return {"error": f"Unexpected error: {str(e)}"}
-        
+        return await call_endpoint("delete_myanimelist_item", anime_id=anime_id)
+
     @mcp.tool()
     async def delete_mymangalist_item(manga_id: int) -> dict:
         """
@@ -383,25 +329,8 @@ def register_tools(mcp: FastMCP):
         Args:
             anime_id: The ID of the anime to delete.
         """
-        try:
-            token = await get_mal_access_token()
-            if not token:
-                raise ValueError("No valid access token available")
-            headers = {"Authorization": f"Bearer {token}"}
-            async with httpx.AsyncClient() as client:
-                response = await client.delete(
-                    f"https://api.myanimelist.net/v2/manga/{manga_id}/my_list_status",
-                    headers=headers
-                )
-                response.raise_for_status()
-                return {"message": f"Manga ID {manga_id} deleted successfully"}
-        except httpx.HTTPStatusError as e:
-            return {"error": str(e), "status_code": e.response.status_code, "response_text": e.response.text}
-        except ValueError as e:
-            return {"error": str(e)}
-        except Exception as e:
-            return {"error": f"Unexpected error: {str(e)}"}
-        
+        return await call_endpoint("delete_mymangalist_item", manga_id=manga_id)
+
     @mcp.tool()
     async def update_myanimelist(
         anime_id: Annotated[int, Field(description="ID of the anime to update", ge=1)],
@@ -461,46 +390,21 @@ def register_tools(mcp: FastMCP):
             comments: Comments about the anime.
         
         """
-        try:
-            fields = {
-                "status": status,
-                "score": score,
-                "num_watched_episodes": num_watched_episodes,
-                "is_rewatching": is_rewatching,
-                "priority": priority,
-                "num_times_rewatched": num_times_rewatched,
-                "rewatch_value": rewatch_value,
-                "tags": tags,
-                "comments": comments
-            }
-            fields = {k: v for k, v in fields.items() if v is not None}
-            if not fields:
-                return {"error": "At least one field must be provided to update the anime"}
-
-            token = await get_mal_access_token()
-            if not token:
-                raise ValueError("No valid access token available")
-
-            headers = {
-                "Authorization": f"Bearer {token}",
-                "Content-Type": "application/x-www-form-urlencoded"
-            }
-            async with httpx.AsyncClient() as client:
-                response = await client.put(
-                    f"https://api.myanimelist.net/v2/anime/{anime_id}/my_list_status",
-                    headers=headers,
-                    data=fields
-                )
-                response.raise_for_status()
-                return response.json()
-        except ValidationError as e:
-            return {"error": f"Invalid input: {str(e)}"}
-        except httpx.HTTPStatusError as e:
-            return {"error": str(e), "status_code": e.response.status_code, "response_text": e.response.text}
-        except ValueError as e:
-            return {"error": str(e)}
-        except Exception as e:
-            return {"error": f"Unexpected error: {str(e)}"}
+        fields = {
+            "status": status,
+            "score": score,
+            "num_watched_episodes": num_watched_episodes,
+            "is_rewatching": is_rewatching,
+            "priority": priority,
+            "num_times_rewatched": num_times_rewatched,
+            "rewatch_value": rewatch_value,
+            "tags": tags,
+            "comments": comments
+        }
+        fields = {k: v for k, v in fields.items() if v is not None}
+        if not fields:
+            return {"error": "At least one field must be provided to update the anime"}
+        return await call_endpoint("update_myanimelist", anime_id=anime_id, **fields)
         
     @mcp.tool()
     async def update_mymangalist(
@@ -566,46 +470,28 @@ def register_tools(mcp: FastMCP):
             comments: Comments about the manga.
         
         """
-        try:
-            fields = {
-                "status": status,
-                "is_rereading": is_rereading,
-                "score": score,
-                "num_volumes_read": num_volumes_read,
-                "num_chapters_read": num_chapters_read,
-                "priority": priority,
-                "num_times_reread": num_times_reread,
-                "reread_value": reread_value,
-                "tags": tags,
-                "comments": comments
-            }
-            fields = {k: v for k, v in fields.items() if v is not None}
-            if not fields:
-                return {"error": "At least one field must be provided to update the manga"}
-
-            token = await get_mal_access_token()
-            if not token:
-                raise ValueError("No valid access token available")
-
-            headers = {
-                "Authorization": f"Bearer {token}",
-                "Content-Type": "application/x-www-form-urlencoded"
-            }
-            async with httpx.AsyncClient() as client:
-                response = await client.put(
-                    f"https://api.myanimelist.net/v2/manga/{manga_id}/my_list_status",
-                    headers=headers,
-                    data=fields
-                )
-                response.raise_for_status()
-                return response.json()
-        except ValidationError as e:
-            return {"error": f"Invalid input: {str(e)}"}
-        except httpx.HTTPStatusError as e:
-            return {"error": str(e), "status_code": e.response.status_code, "response_text": e.response.text}
-        except ValueError as e:
-            return {"error": str(e)}
-        except Exception as e:
-            return {"error": f"Unexpected error: {str(e)}"}
-            
-        
+        fields = {
+            "status": status,
+            "is_rereading": is_rereading,
+            "score": score,
+            "num_volumes_read": num_volumes_read,
+            "num_chapters_read": num_chapters_read,
+            "priority": priority,
+            "num_times_reread": num_times_reread,
+            "reread_value": reread_value,
+            "tags": tags,
+            "comments": comments
+        }
+        fields = {k: v for k, v in fields.items() if v is not None}
+        if not fields:
+            return {"error": "At least one field must be provided to update the manga"}
+        return await call_endpoint("update_mymangalist", manga_id=manga_id, **fields)
+
+    #Server
+    @mcp.tool()
+    async def get_server_stats() -> dict:
+        """
+        Returns per-endpoint request statistics for this server process: calls, errors,
+        cache hits, coalesced requests, upstream requests and total time spent.
+        """
+        return {"endpoints": metrics.snapshot()}
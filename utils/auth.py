@@ -7,9 +7,6 @@ import socketserver
 import urllib.parse
 import os
 from typing import Optional, Dict
-from dotenv import load_dotenv
-
-load_dotenv()
 
 _access_token: Optional[str] = None
 _refresh_token: Optional[str] = None
@@ -0,0 +1,295 @@
+"""Local columnar index of every anime seen in ranking, seasonal and detail responses.
+
+MAL has no filter endpoint, so filter queries are answered here. Attributes
+are stored column-wise, one row per anime. Genre, media type and airing
+status are bitsets (Python ints, bit n = row n), so category predicates
+are a handful of ANDs/ORs. The mean and popularity columns keep a sort
+order, rebuilt lazily after updates, that is scanned in order until `limit`
+rows pass every predicate.
+
+Whether the index can answer a query alone is tracked by AnimeCatalogue.
+It loads ranking pages (by score or by popularity) as a contiguous prefix.
+Once a query's threshold or its last result falls inside that prefix,
+nothing outside the index could change the answer.
+"""
+import asyncio
+import bisect
+import math
+import time
+from array import array
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from utils.models import Anime, Genre, Page, to_dict
+from utils.pipeline import Call, Handler
+from utils.schemas import AnimeRanking, CatalogueSort
+
+NAN = float("nan")
+COVERAGE_TTL = 24 * 3600
+CATALOGUE_FIELDS = "genres,mean,media_type,status,num_episodes,popularity,num_list_users,rank,start_date"
+RANKING_PAGE_SIZE = 500
+MAX_RANKING_PAGES = 20
+RANKING_SOURCES = {CatalogueSort.MEAN: AnimeRanking.ALL, CatalogueSort.POPULARITY: AnimeRanking.BYPOPULARITY}
+
+
+def _bit_test(bits: bytes, row: int) -> bool:
+    return row >> 3 < len(bits) and bits[row >> 3] >> (row & 7) & 1
+
+
+class CatalogueIndex:
+    def __init__(self):
+        self.ids = array("l")
+        self.titles: List[Optional[str]] = []
+        self.means = array("d")
+        self.popularity = array("l")
+        self.num_episodes = array("l")
+        self.num_list_users = array("l")
+        self.row: Dict[int, int] = {}
+        self.genre_bits: Dict[Genre, int] = defaultdict(int)
+        self.media_type_bits: Dict[Any, int] = defaultdict(int)
+        self.status_bits: Dict[Any, int] = defaultdict(int)
+        self.genre_by_name: Dict[str, Genre] = {}
+        self._genres_of: List[Tuple[Genre, ...]] = []
+        self._media_type_of: List[Any] = []
+        self._status_of: List[Any] = []
+        self._orders: Dict[CatalogueSort, Tuple[array, array]] = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def upsert(self, anime: Anime) -> None:
+        """Adds or updates a row. Attributes missing from `anime` keep their indexed value."""
+        if anime.id is None:
+            return
+        row = self.row.get(anime.id)
+        if row is None:
+            row = self.row[anime.id] = len(self.ids)
+            self.ids.append(anime.id)
+            self.titles.append(None)
+            self.means.append(NAN)
+            self.popularity.append(0)
+            self.num_episodes.append(0)
+            self.num_list_users.append(0)
+            self._genres_of.append(())
+            self._media_type_of.append(None)
+            self._status_of.append(None)
+        bit = 1 << row
+        if anime.title is not None:
+            self.titles[row] = anime.title
+        if anime.mean is not None:
+            self.means[row] = anime.mean
+            self._orders.pop(CatalogueSort.MEAN, None)
+        if anime.popularity is not None:
+            self.popularity[row] = anime.popularity
+            self._orders.pop(CatalogueSort.POPULARITY, None)
+        if anime.num_episodes is not None:
+            self.num_episodes[row] = anime.num_episodes
+        if anime.num_list_users is not None:
+            self.num_list_users[row] = anime.num_list_users
+        if anime.genres is not None:
+            for genre in self._genres_of[row]:
+                self.genre_bits[genre] &= ~bit
+            for genre in anime.genres:
+                self.genre_bits[genre] |= bit
+                self.genre_by_name[genre.name.lower()] = genre
+            self._genres_of[row] = anime.genres
+        if anime.media_type is not None:
+            self._set_category(self.media_type_bits, self._media_type_of, row, anime.media_type)
+        if anime.status is not None:
+            self._set_category(self.status_bits, self._status_of, row, anime.status)
+
+    @staticmethod
+    def _set_category(bits: Dict[Any, int], values: List[Any], row: int, value: Any) -> None:
+        old = values[row]
+        if old is not None:
+            bits[old] &= ~(1 << row)
+        bits[value] |= 1 << row
+        values[row] = value
+
+    def _order(self, sort_by: CatalogueSort) -> Tuple[array, array]:
+        """Rows with a known value for `sort_by`, best first, and their ascending scan keys."""
+        order = self._orders.get(sort_by)
+        if order is None:
+            if sort_by is CatalogueSort.MEAN:
+                keyed = sorted((-m, r) for r, m in enumerate(self.means) if not math.isnan(m))
+            else:
+                keyed = sorted((p, r) for r, p in enumerate(self.popularity) if p)
+            order = self._orders[sort_by] = (array("l", (r for _, r in keyed)), array("d", (k for k, _ in keyed)))
+        return order
+
+    def query(self, genres: List[Genre] = (), media_types: List[Any] = (), statuses: List[Any] = (),
+              min_mean: Optional[float] = None, max_mean: Optional[float] = None,
+              min_episodes: Optional[int] = None, max_episodes: Optional[int] = None,
+              max_popularity: Optional[int] = None,
+              sort_by: CatalogueSort = CatalogueSort.MEAN, limit: int = 10) -> List[int]:
+        """Returns up to `limit` matching rows, best first by `sort_by`."""
+        mask = (1 << len(self.ids)) - 1
+        for genre in genres:
+            mask &= self.genre_bits.get(genre, 0)
+        for bits, wanted in ((self.media_type_bits, media_types), (self.status_bits, statuses)):
+            if wanted:
+                either = 0
+                for value in wanted:
+                    either |= bits.get(value, 0)
+                mask &= either
+        if not mask:
+            return []
+        candidates = mask.to_bytes((len(self.ids) + 7) // 8, "little")
+
+        rows, keys = self._order(sort_by)
+        start, stop = 0, len(rows)
+        if sort_by is CatalogueSort.MEAN:
+            if max_mean is not None:
+                start = bisect.bisect_left(keys, -max_mean)
+            if min_mean is not None:
+                stop = bisect.bisect_right(keys, -min_mean)
+        elif max_popularity is not None:
+            stop = bisect.bisect_right(keys, max_popularity)
+
+        found = []
+        for i in range(start, stop):
+            row = rows[i]
+            if not _bit_test(candidates, row):
+                continue
+            mean = self.means[row]
+            if (min_mean is not None or max_mean is not None) and math.isnan(mean):
+                continue
+            if (min_mean is not None and mean < min_mean) or (max_mean is not None and mean > max_mean):
+                continue
+            episodes = self.num_episodes[row]
+            if (min_episodes is not None or max_episodes is not None) and not episodes:
+                continue  # 0 means MAL doesn't know the episode count yet
+            if (min_episodes is not None and episodes < min_episodes) or (max_episodes is not None and episodes > max_episodes):
+                continue
+            popularity = self.popularity[row]
+            if max_popularity is not None and not (0 < popularity <= max_popularity):
+                continue
+            found.append(row)
+            if len(found) == limit:
+                break
+        return found
+
+    def describe(self, row: int) -> dict:
+        mean = self.means[row]
+        return {
+            "id": self.ids[row],
+            "title": self.titles[row],
+            "mean": None if math.isnan(mean) else mean,
+            "popularity": self.popularity[row] or None,
+            "num_list_users": self.num_list_users[row] or None,
+            "num_episodes": self.num_episodes[row] or None,
+            "media_type": to_dict(self._media_type_of[row]),
+            "status": to_dict(self._status_of[row]),
+            "genres": [genre.name for genre in self._genres_of[row]],
+        }
+
+
+class IndexResponses:
+    """Middleware that feeds every anime model coming back from upstream into the catalogue."""
+
+    def __init__(self, index: CatalogueIndex):
+        self.index = index
+
+    async def __call__(self, call: Call, call_next: Handler) -> Any:
+        result = await call_next(call)
+        if isinstance(result, Anime):
+            self.index.upsert(result)
+        elif isinstance(result, Page):
+            for entry in result.data or ():
+                if isinstance(entry.node, Anime):
+                    self.index.upsert(entry.node)
+        return result
+
+
+@dataclass
+class Coverage:
+    next_offset: int = 0
+    exhausted: bool = False
+    floor: Optional[float] = None
+    loaded_at: float = 0.0
+
+
+RankingFetcher = Callable[[AnimeRanking, int, int], Awaitable[Any]]
+
+
+class AnimeCatalogue:
+    def __init__(self, index: CatalogueIndex, fetch_ranking: RankingFetcher):
+        self.index = index
+        self.fetch_ranking = fetch_ranking
+        self.coverage: Dict[CatalogueSort, Coverage] = defaultdict(Coverage)
+        self._locks: Dict[CatalogueSort, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+    def _covered(self, sort_by: CatalogueSort, rows: List[int], limit: int,
+                 min_mean: Optional[float], max_popularity: Optional[int]) -> bool:
+        coverage = self.coverage[sort_by]
+        if coverage.exhausted:
+            return True
+        if coverage.floor is None:
+            return False
+        if sort_by is CatalogueSort.MEAN:
+            # Ties at the floor may continue past the loaded prefix, hence strict.
+            if min_mean is not None and min_mean > coverage.floor:
+                return True
+            return bool(rows) and len(rows) == limit and self.index.means[rows[-1]] > coverage.floor
+        if max_popularity is not None and max_popularity <= coverage.floor:
+            return True
+        return bool(rows) and len(rows) == limit and self.index.popularity[rows[-1]] <= coverage.floor
+
+    async def _load_next(self, sort_by: CatalogueSort) -> Optional[dict]:
+        coverage = self.coverage[sort_by]
+        offset = coverage.next_offset
+        page = await self.fetch_ranking(RANKING_SOURCES[sort_by], offset, RANKING_PAGE_SIZE)
+        if isinstance(page, dict):
+            return page
+        nodes = [entry.node for entry in page.data or ()]
+        # The page may be a cache hit that never passed IndexResponses, and
+        # coverage is only sound for rows that are actually in the index.
+        for node in nodes:
+            self.index.upsert(node)
+        coverage.next_offset = offset + len(nodes)
+        coverage.exhausted = not nodes or not (page.paging or {}).get("next")
+        coverage.loaded_at = time.time()
+        last = nodes[-1] if nodes else None
+        if last is not None:
+            coverage.floor = last.mean if sort_by is CatalogueSort.MEAN else last.popularity
+        return None
+
+    async def query(self, max_pages: int, sort_by: CatalogueSort, limit: int,
+                    genre_names: List[str] = (), **predicates: Any) -> dict:
+        # Serialised per ranking so concurrent queries extend the prefix one page at a time.
+        async with self._locks[sort_by]:
+            return await self._query(max_pages, sort_by, limit, genre_names, **predicates)
+
+    async def _query(self, max_pages: int, sort_by: CatalogueSort, limit: int,
+                     genre_names: List[str], **predicates: Any) -> dict:
+        coverage = self.coverage[sort_by]
+        if coverage.loaded_at and time.time() - coverage.loaded_at > COVERAGE_TTL:
+            self.coverage[sort_by] = Coverage()
+        pages = 0
+        while True:
+            # Genre names are learned from responses, so resolve them again after every page.
+            unknown = [name for name in genre_names if name.lower() not in self.index.genre_by_name]
+            if unknown:
+                rows, covered = [], False
+            else:
+                genres = [self.index.genre_by_name[name.lower()] for name in genre_names]
+                rows = self.index.query(genres=genres, sort_by=sort_by, limit=limit, **predicates)
+                covered = self._covered(sort_by, rows, limit, predicates.get("min_mean"), predicates.get("max_popularity"))
+            if covered or pages >= max_pages or self.coverage[sort_by].exhausted:
+                break
+            error = await self._load_next(sort_by)
+            if error is not None:
+                return error
+            pages += 1
+        if unknown:
+            return {
+                "error": f"Unknown genres: {', '.join(unknown)}",
+                "known_genres": sorted(genre.name for genre in self.index.genre_by_name.values()),
+            }
+        return {
+            "data": [self.index.describe(row) for row in rows],
+            "covered": covered,
+            "upstream_pages": pages,
+            "indexed": len(self.index),
+        }
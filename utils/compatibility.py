@@ -0,0 +1,94 @@
+import statistics
+from array import array
+from typing import Dict, List, Optional, Union
+
+from utils.models import Entry
+from utils.schemas import AnimeStatus
+
+UNSEEN_STATUSES = frozenset({None, AnimeStatus.PLANNING})
+
+
+class ListIndex:
+    """Column-oriented copy of a user's anime list with an anime ID -> row index."""
+    __slots__ = ("ids", "scores", "statuses", "titles", "position")
+
+    def __init__(self, entries: List[Entry]):
+        self.ids = array("l")
+        self.scores = array("b")
+        self.statuses: List[Union[AnimeStatus, str, None]] = []
+        self.titles: List[str] = []
+        self.position: Dict[int, int] = {}
+        for entry in entries:
+            node = entry.node
+            if node.id in self.position:
+                continue
+            list_status = entry.list_status
+            self.position[node.id] = len(self.ids)
+            self.ids.append(node.id)
+            self.scores.append((list_status and list_status.score) or 0)
+            self.statuses.append(list_status and list_status.status)
+            self.titles.append(node.title or "")
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def summary(self, username: str) -> dict:
+        scored = [s for s in self.scores if s]
+        return {
+            "username": username,
+            "entries": len(self),
+            "scored": len(scored),
+            "mean_score": round(statistics.fmean(scored), 2) if scored else None,
+        }
+
+
+def compare_lists(username_a: str, a: ListIndex, username_b: str, b: ListIndex,
+                  min_score: int = 8, limit: int = 20) -> dict:
+    """Joins two lists on anime ID and scores how similar the two users' tastes are.
+
+    Suggestions are the titles A scored at least `min_score` that B has not
+    watched (absent from B's list or only planned), best-scored first.
+    """
+    shared_a = array("l")
+    shared_b = array("l")
+    for row_a, anime_id in enumerate(a.ids):
+        row_b = b.position.get(anime_id)
+        if row_b is not None:
+            shared_a.append(row_a)
+            shared_b.append(row_b)
+
+    scores_a = array("b", (a.scores[i] for i in shared_a))
+    scores_b = array("b", (b.scores[i] for i in shared_b))
+    both_scored = [(x, y) for x, y in zip(scores_a, scores_b) if x and y]
+    xs = [x for x, _ in both_scored]
+    ys = [y for _, y in both_scored]
+    try:
+        correlation: Optional[float] = round(statistics.correlation(xs, ys), 4)
+    except statistics.StatisticsError:
+        correlation = None  # fewer than two pairs, or one user gave every title the same score
+
+    candidates = []
+    for row_a, anime_id in enumerate(a.ids):
+        score = a.scores[row_a]
+        if score < min_score:
+            continue
+        row_b = b.position.get(anime_id)
+        status_b = b.statuses[row_b] if row_b is not None else None
+        if status_b in UNSEEN_STATUSES:
+            candidates.append((-score, a.titles[row_a], anime_id, status_b))
+    candidates.sort()
+
+    union = len(a) + len(b) - len(shared_a)
+    return {
+        "user_a": a.summary(username_a),
+        "user_b": b.summary(username_b),
+        "shared": len(shared_a),
+        "jaccard": round(len(shared_a) / union, 4) if union else 0.0,
+        "shared_scored": len(both_scored),
+        "score_correlation": correlation,
+        "mean_absolute_difference": round(statistics.fmean(abs(x - y) for x, y in both_scored), 2) if both_scored else None,
+        "suggestions": [
+            {"id": anime_id, "title": title, "score": -neg_score, "planned_by_b": status_b is AnimeStatus.PLANNING}
+            for neg_score, title, anime_id, status_b in candidates[:limit]
+        ],
+    }
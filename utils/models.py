@@ -0,0 +1,243 @@
+"""Compact typed models for MyAnimeList responses.
+
+Responses are decoded once, straight from the response bytes, into slotted
+dataclasses. Enumerated strings become the members in utils/schemas.py, so
+every "tv" or "currently_airing" in memory is the same object. Genres are
+shared by ID too. Keys that aren't modelled are kept in `extra`, so
+`to_dict()` gives back the same JSON the API sent. The only difference is
+that explicit nulls are dropped.
+"""
+import sys
+from dataclasses import dataclass, fields, is_dataclass
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from utils.schemas import (
+    AnimeAiringStatus, AnimeMediaType, AnimeStatus, MangaMediaType,
+    MangaPublishingStatus, MangaStatus, Season, Weekday,
+)
+
+Decoders = Dict[str, Optional[Callable[[Any], Any]]]
+
+_EXTRA = object()
+
+
+def _enum(enum_cls: type) -> Callable[[str], Union[Enum, str]]:
+    members = {member.value: member for member in enum_cls}
+
+    def decode(value: str) -> Union[Enum, str]:
+        member = members.get(value)
+        return member if member is not None else sys.intern(value)  # values MAL adds later still stay shared
+    return decode
+
+
+def _decode(cls: type, data: dict, decoders: Decoders) -> Any:
+    values = {}
+    extra = None
+    for key, value in data.items():
+        decoder = decoders.get(key, _EXTRA)
+        if decoder is _EXTRA:
+            if extra is None:
+                extra = {}
+            extra[key] = value
+        elif decoder is None or value is None:
+            values[key] = value
+        else:
+            values[key] = decoder(value)
+    if extra is not None:
+        values["extra"] = extra
+    return cls(**values)
+
+
+@dataclass(slots=True)
+class Picture:
+    medium: Optional[str] = None
+    large: Optional[str] = None
+    extra: Optional[dict] = None
+
+
+@dataclass(slots=True, frozen=True)
+class Genre:
+    id: int
+    name: str
+
+
+# Keyed by (id, name): anime and manga genre IDs overlap, and MAL renames genres.
+_genres: Dict[Tuple[int, str], Genre] = {}
+
+
+def _genre(data: dict) -> Genre:
+    key = (data["id"], data["name"])
+    genre = _genres.get(key)
+    if genre is None:
+        genre = _genres[key] = Genre(data["id"], sys.intern(data["name"]))
+    return genre
+
+
+@dataclass(slots=True)
+class StartSeason:
+    year: Optional[int] = None
+    season: Union[Season, str, None] = None
+    extra: Optional[dict] = None
+
+
+@dataclass(slots=True)
+class Broadcast:
+    day_of_the_week: Union[Weekday, str, None] = None
+    start_time: Optional[str] = None
+    extra: Optional[dict] = None
+
+
+@dataclass(slots=True)
+class ListStatus:
+    status: Union[AnimeStatus, MangaStatus, str, None] = None
+    score: Optional[int] = None
+    updated_at: Optional[str] = None
+    extra: Optional[dict] = None
+
+
+@dataclass(slots=True)
+class Anime:
+    id: Optional[int] = None
+    title: Optional[str] = None
+    main_picture: Optional[Picture] = None
+    mean: Optional[float] = None
+    rank: Optional[int] = None
+    popularity: Optional[int] = None
+    num_list_users: Optional[int] = None
+    media_type: Union[AnimeMediaType, str, None] = None
+    status: Union[AnimeAiringStatus, str, None] = None
+    genres: Optional[Tuple[Genre, ...]] = None
+    num_episodes: Optional[int] = None
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    start_season: Optional[StartSeason] = None
+    broadcast: Optional[Broadcast] = None
+    my_list_status: Optional[ListStatus] = None
+    extra: Optional[dict] = None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Anime":
+        return _decode(cls, data, _ANIME)
+
+
+@dataclass(slots=True)
+class Manga:
+    id: Optional[int] = None
+    title: Optional[str] = None
+    main_picture: Optional[Picture] = None
+    mean: Optional[float] = None
+    rank: Optional[int] = None
+    popularity: Optional[int] = None
+    num_list_users: Optional[int] = None
+    media_type: Union[MangaMediaType, str, None] = None
+    status: Union[MangaPublishingStatus, str, None] = None
+    genres: Optional[Tuple[Genre, ...]] = None
+    num_volumes: Optional[int] = None
+    num_chapters: Optional[int] = None
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    my_list_status: Optional[ListStatus] = None
+    extra: Optional[dict] = None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Manga":
+        return _decode(cls, data, _MANGA)
+
+
+@dataclass(slots=True)
+class Entry:
+    """One item of a paged response: the node plus its ranking or list status."""
+    node: Union[Anime, Manga, None] = None
+    list_status: Optional[ListStatus] = None
+    ranking: Optional[dict] = None
+    extra: Optional[dict] = None
+
+
+@dataclass(slots=True)
+class Page:
+    data: Optional[List[Entry]] = None
+    paging: Optional[dict] = None
+    extra: Optional[dict] = None
+
+
+def _picture(data: dict) -> Picture:
+    return _decode(Picture, data, _PICTURE)
+
+
+def _list_status(status_enum: type) -> Callable[[dict], ListStatus]:
+    decoders = {"status": _enum(status_enum), "score": None, "updated_at": None}
+    return lambda data: _decode(ListStatus, data, decoders)
+
+
+_PICTURE = {"medium": None, "large": None}
+_START_SEASON = {"year": None, "season": _enum(Season)}
+_BROADCAST = {"day_of_the_week": _enum(Weekday), "start_time": None}
+_COMMON = {
+    "id": None,
+    "title": None,
+    "main_picture": _picture,
+    "mean": None,
+    "rank": None,
+    "popularity": None,
+    "num_list_users": None,
+    "genres": lambda genres: tuple(_genre(g) for g in genres),
+    "start_date": None,
+    "end_date": None,
+}
+_ANIME = {
+    **_COMMON,
+    "media_type": _enum(AnimeMediaType),
+    "status": _enum(AnimeAiringStatus),
+    "num_episodes": None,
+    "start_season": lambda data: _decode(StartSeason, data, _START_SEASON),
+    "broadcast": lambda data: _decode(Broadcast, data, _BROADCAST),
+    "my_list_status": _list_status(AnimeStatus),
+}
+_MANGA = {
+    **_COMMON,
+    "media_type": _enum(MangaMediaType),
+    "status": _enum(MangaPublishingStatus),
+    "num_volumes": None,
+    "num_chapters": None,
+    "my_list_status": _list_status(MangaStatus),
+}
+
+
+def _page_decoder(node_cls: type, status_enum: type) -> Callable[[dict], Page]:
+    entry_decoders = {"node": node_cls.from_dict, "list_status": _list_status(status_enum), "ranking": None}
+    page_decoders = {
+        "data": lambda items: [_decode(Entry, item, entry_decoders) for item in items],
+        "paging": None,
+    }
+    return lambda data: _decode(Page, data, page_decoders)
+
+
+decode_anime_page = _page_decoder(Anime, AnimeStatus)
+decode_manga_page = _page_decoder(Manga, MangaStatus)
+
+
+_field_names: Dict[type, Tuple[str, ...]] = {}
+
+
+def to_dict(value: Any) -> Any:
+    """Serializes models (and anything containing them) back to the API's JSON shape."""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (list, tuple)):
+        return [to_dict(v) for v in value]
+    if is_dataclass(value) and not isinstance(value, type):
+        cls = type(value)
+        names = _field_names.get(cls)
+        if names is None:
+            names = _field_names[cls] = tuple(f.name for f in fields(cls) if f.name != "extra")
+        out = {}
+        for name in names:
+            item = getattr(value, name)
+            if item is not None:
+                out[name] = to_dict(item)
+        extra = getattr(value, "extra", None)
+        if extra:
+            out.update(extra)
+        return out
+    return value
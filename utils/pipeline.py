@@ -0,0 +1,334 @@
+import asyncio
+import json
+import string
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import asdict, dataclass, field
+from enum import Enum
+from functools import cached_property
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+
+@dataclass(frozen=True)
+class Endpoint:
+    """Declarative description of a MyAnimeList API endpoint.
+
+    `path` is a format string whose placeholders are filled from the tool
+    arguments; the remaining arguments become query params (GET/DELETE) or
+    form data (PUT/POST). `ttl` enables response caching for GETs and
+    `invalidates` lists the endpoints whose cached responses a write makes stale.
+    `model` decodes the JSON payload into a typed model (see utils/models.py).
+    """
+    name: str
+    method: str
+    path: str
+    auth: bool = False
+    ttl: float = 0.0
+    defaults: Dict[str, Any] = field(default_factory=dict)
+    invalidates: Tuple[str, ...] = ()
+    project: Optional[Callable[["Call", Any], Any]] = None
+    model: Optional[Callable[[dict], Any]] = None
+
+    @cached_property
+    def path_fields(self) -> frozenset:
+        return frozenset(name for _, name, _, _ in string.Formatter().parse(self.path) if name)
+
+    @property
+    def has_body(self) -> bool:
+        return self.method in ("PUT", "POST", "PATCH")
+
+
+@dataclass
+class Call:
+    endpoint: Endpoint
+    path: str
+    params: Dict[str, Any]
+    args: Dict[str, Any]
+    data: Optional[Dict[str, Any]] = None
+    headers: Dict[str, str] = field(default_factory=dict)
+    meta: Dict[str, Any] = field(default_factory=dict)
+
+    @cached_property
+    def key(self) -> tuple:
+        return (self.endpoint.name, self.path, tuple(sorted(self.params.items())))
+
+
+Handler = Callable[[Call], Awaitable[Any]]
+Middleware = Callable[[Call, Handler], Awaitable[Any]]
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (list, tuple)):
+        return ",".join(str(_encode(v)) for v in value)
+    return value
+
+
+def build_call(endpoint: Endpoint, args: Dict[str, Any]) -> Call:
+    values = dict(endpoint.defaults)
+    for k, v in args.items():
+        if v is None:
+            continue
+        # In a query an empty list/string means "not given", so defaults still
+        # apply; in a body it clears the field (e.g. comments="").
+        if not endpoint.has_body and (v == "" or v == []):
+            continue
+        values[k] = _encode(v)
+    path = endpoint.path.format(**{k: values.pop(k) for k in endpoint.path_fields})
+    if endpoint.has_body:
+        return Call(endpoint, path, {}, args, data=values)
+    return Call(endpoint, path, values, args)
+
+
+class Pipeline:
+    def __init__(self, middlewares: List[Middleware], transport: Handler):
+        handler = transport
+        for middleware in reversed(middlewares):
+            handler = self._bind(middleware, handler)
+        self._handler = handler
+
+    @staticmethod
+    def _bind(middleware: Middleware, call_next: Handler) -> Handler:
+        async def handler(call: Call) -> Any:
+            return await middleware(call, call_next)
+        return handler
+
+    async def __call__(self, endpoint: Endpoint, **args: Any) -> Any:
+        return await self._handler(build_call(endpoint, args))
+
+
+class Transport:
+    """Terminal handler: performs the HTTP request on a shared, pooled client."""
+
+    def __init__(self, base_url: str, timeout: float = 30.0):
+        self.base_url = base_url
+        self.timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout)
+        return self._client
+
+    async def __call__(self, call: Call) -> Any:
+        call.meta["upstream"] = call.meta.get("upstream", 0) + 1
+        response = await self.client.request(
+            call.endpoint.method,
+            call.path,
+            params=call.params or None,
+            data=call.data,
+            headers=call.headers)
+        response.raise_for_status()
+        if not response.content:
+            return {}
+        payload = json.loads(response.content)
+        model = call.endpoint.model
+        return model(payload) if model is not None else payload
+
+
+async def map_errors(call: Call, call_next: Handler) -> Any:
+    try:
+        return await call_next(call)
+    except httpx.HTTPStatusError as e:
+        error = {"error": str(e), "status_code": e.response.status_code}
+        if call.endpoint.auth:
+            error["response_text"] = e.response.text
+        return error
+    except ValueError as e:
+        return {"error": str(e)}
+    except Exception as e:
+        if call.endpoint.auth:
+            return {"error": f"Unexpected error: {str(e)}"}
+        return {"error": str(e)}
+
+
+async def project(call: Call, call_next: Handler) -> Any:
+    result = await call_next(call)
+    if call.endpoint.project is not None:
+        return call.endpoint.project(call, result)
+    return result
+
+
+class Authenticate:
+    """Adds the client ID header to public endpoints and a bearer token to auth ones."""
+
+    def __init__(self, client_id: Optional[str], token_provider: Callable[[], Awaitable[str]]):
+        self._public_headers = {"X-MAL-CLIENT-ID": f"{client_id}"}
+        self._token_provider = token_provider
+
+    async def __call__(self, call: Call, call_next: Handler) -> Any:
+        if call.endpoint.auth:
+            token = await self._token_provider()
+            if not token:
+                raise ValueError("No valid access token available")
+            call.headers["Authorization"] = f"Bearer {token}"
+        else:
+            call.headers.update(self._public_headers)
+        return await call_next(call)
+
+
+class RateLimit:
+    """Token bucket shared by every upstream request, retries included."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    async def __call__(self, call: Call, call_next: Handler) -> Any:
+        if self.rate > 0:
+            await self.acquire()
+        return await call_next(call)
+
+
+class Retry:
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+    def __init__(self, attempts: int = 3, backoff: float = 0.5):
+        self.attempts = attempts
+        self.backoff = backoff
+
+    async def __call__(self, call: Call, call_next: Handler) -> Any:
+        for attempt in range(self.attempts):
+            last = attempt == self.attempts - 1
+            delay = self.backoff * 2 ** attempt
+            try:
+                return await call_next(call)
+            except httpx.HTTPStatusError as e:
+                if last or e.response.status_code not in self.RETRY_STATUSES:
+                    raise
+                retry_after = e.response.headers.get("Retry-After", "")
+                if retry_after.isdigit():
+                    delay = float(retry_after)
+            except httpx.TransportError:
+                if last:
+                    raise
+            await asyncio.sleep(delay)
+
+
+_MISSING = object()
+
+
+class ResponseCache:
+    """In-process LRU of GET responses with per-endpoint TTLs."""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[tuple, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: tuple) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return _MISSING
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: tuple, value: Any, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, names: Tuple[str, ...]) -> None:
+        for key in [k for k in self._entries if k[0] in names]:
+            del self._entries[key]
+
+    async def __call__(self, call: Call, call_next: Handler) -> Any:
+        endpoint = call.endpoint
+        if endpoint.ttl > 0 and endpoint.method == "GET":
+            value = self.get(call.key)
+            if value is not _MISSING:
+                call.meta["cache_hit"] = True
+                return value
+            value = await call_next(call)
+            self.set(call.key, value, endpoint.ttl)
+            return value
+        value = await call_next(call)
+        if endpoint.invalidates:
+            self.invalidate(endpoint.invalidates)
+        return value
+
+
+class Coalesce:
+    """Shares a single upstream request between identical concurrent GETs.
+
+    The request runs as its own task, so cancelling the caller that started it
+    doesn't cancel it for the others; it is only cancelled once nobody waits.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[tuple, Tuple[asyncio.Task, List[int]]] = {}
+
+    async def __call__(self, call: Call, call_next: Handler) -> Any:
+        if call.endpoint.method != "GET":
+            return await call_next(call)
+        key = call.key
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            call.meta["coalesced"] = True
+        else:
+            task = asyncio.ensure_future(call_next(call))
+            inflight = self._inflight[key] = (task, [0])
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        task, waiters = inflight
+        waiters[0] += 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            waiters[0] -= 1
+            if not waiters[0] and not task.done():
+                task.cancel()
+
+
+@dataclass
+class EndpointStats:
+    calls: int = 0
+    errors: int = 0
+    cache_hits: int = 0
+    coalesced: int = 0
+    upstream_requests: int = 0
+    total_seconds: float = 0.0
+
+
+class Metrics:
+    def __init__(self):
+        self.stats: Dict[str, EndpointStats] = defaultdict(EndpointStats)
+
+    async def __call__(self, call: Call, call_next: Handler) -> Any:
+        stats = self.stats[call.endpoint.name]
+        stats.calls += 1
+        start = time.perf_counter()
+        try:
+            return await call_next(call)
+        except Exception:
+            stats.errors += 1
+            raise
+        finally:
+            stats.total_seconds += time.perf_counter() - start
+            stats.cache_hits += bool(call.meta.get("cache_hit"))
+            stats.coalesced += bool(call.meta.get("coalesced"))
+            stats.upstream_requests += call.meta.get("upstream", 0)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {name: asdict(stats) for name, stats in self.stats.items()}
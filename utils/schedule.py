@@ -0,0 +1,186 @@
+"""Weekly airing schedule built from the seasonal anime lists.
+
+MAL broadcast times are in JST, so the index stores each show once, keyed
+by its JST minute of the week (0 = Monday 00:00) in a sorted list. A query
+for weekdays and a time window in any timezone turns into at most two
+bisected ranges per day over that list.
+"""
+import asyncio
+import bisect
+import datetime
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from utils.models import Anime, to_dict
+from utils.schemas import AnimeAiringStatus, Season, Weekday
+
+JST = datetime.timezone(datetime.timedelta(hours=9), "JST")  # Japan has no DST
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+WEEKDAYS = [Weekday.MONDAY, Weekday.TUESDAY, Weekday.WEDNESDAY, Weekday.THURSDAY,
+            Weekday.FRIDAY, Weekday.SATURDAY, Weekday.SUNDAY]
+SEASONS = [Season.WINTER, Season.SPRING, Season.SUMMER, Season.FALL]
+
+SeasonFetcher = Callable[[int, Season], Awaitable[Any]]
+
+
+def season_of(day: datetime.date) -> Tuple[int, Season]:
+    return day.year, SEASONS[(day.month - 1) // 3]
+
+
+def previous_season(year: int, season: Season) -> Tuple[int, Season]:
+    index = SEASONS.index(season)
+    return (year - 1, Season.FALL) if index == 0 else (year, SEASONS[index - 1])
+
+
+def parse_time(value: str) -> int:
+    hours, minutes = value.split(":")
+    if not (0 <= int(hours) < 24 and 0 <= int(minutes) < 60):
+        raise ValueError(f"Invalid time: {value}")
+    return int(hours) * 60 + int(minutes)
+
+
+def broadcast_minute(anime: Anime) -> Optional[int]:
+    """JST minute of the week the show airs, or None if it has no weekly slot."""
+    broadcast = anime.broadcast
+    if broadcast is None or broadcast.day_of_the_week not in WEEKDAYS or not broadcast.start_time:
+        return None
+    try:
+        return WEEKDAYS.index(broadcast.day_of_the_week) * MINUTES_PER_DAY + parse_time(broadcast.start_time)
+    except ValueError:
+        return None
+
+
+class ScheduleIndex:
+    def __init__(self):
+        self._slots: List[Tuple[int, int]] = []
+        self._minute_of: Dict[int, int] = {}
+        self.shows: Dict[int, Anime] = {}
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def update(self, shows: Dict[int, Anime]) -> int:
+        """Applies a fresh snapshot, touching only shows that changed. Returns how many did."""
+        changed = 0
+        for anime_id in [i for i in self.shows if i not in shows]:
+            self._remove(anime_id)
+            changed += 1
+        for anime_id, anime in shows.items():
+            minute = broadcast_minute(anime)
+            if anime_id in self.shows and self._minute_of.get(anime_id) == minute:
+                self.shows[anime_id] = anime
+                continue
+            self._remove(anime_id)
+            self.shows[anime_id] = anime
+            if minute is not None:
+                self._minute_of[anime_id] = minute
+                bisect.insort(self._slots, (minute, anime_id))
+            changed += 1
+        return changed
+
+    def _remove(self, anime_id: int) -> None:
+        self.shows.pop(anime_id, None)
+        minute = self._minute_of.pop(anime_id, None)
+        if minute is not None:
+            del self._slots[bisect.bisect_left(self._slots, (minute, anime_id))]
+
+    def between(self, start: int, end: int) -> List[Tuple[int, int]]:
+        """Slots with JST minute-of-week in [start, end], wrapping past Sunday night."""
+        start %= MINUTES_PER_WEEK
+        end %= MINUTES_PER_WEEK
+        if start > end:
+            return self.between(start, MINUTES_PER_WEEK - 1) + self.between(0, end)
+        lo = bisect.bisect_left(self._slots, (start, -1))
+        hi = bisect.bisect_right(self._slots, (end, float("inf")))
+        return self._slots[lo:hi]
+
+    def query(self, days: List[Weekday], start: int, end: int, tz: datetime.tzinfo,
+              include_upcoming: bool = False, now: Optional[datetime.datetime] = None) -> List[dict]:
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        today = now.astimezone(tz).date()
+        if end < start:
+            end += MINUTES_PER_DAY  # overnight window, e.g. 22:00-02:00
+        results = []
+        for day in days:
+            # Minutes to add to a JST time to get local time, at the start of this
+            # day's window in the coming week, so a DST change midweek is honoured.
+            date = today + datetime.timedelta(days=(WEEKDAYS.index(day) - today.weekday()) % 7)
+            window_start = datetime.datetime.combine(date, datetime.time(start // 60, start % 60), tz)
+            shift = int((window_start.utcoffset() - JST.utcoffset(None)).total_seconds() // 60)
+            local_start = WEEKDAYS.index(day) * MINUTES_PER_DAY + start
+            local_end = WEEKDAYS.index(day) * MINUTES_PER_DAY + end
+            for minute, anime_id in self.between(local_start - shift, local_end - shift):
+                if not include_upcoming and self.shows[anime_id].status is not AnimeAiringStatus.AIRING:
+                    continue
+                # Sort by position within the window, so 23:30 comes before 00:10 overnight.
+                offset = (minute + shift - local_start) % MINUTES_PER_WEEK
+                results.append((local_start, offset, anime_id))
+        results.sort()
+        return [self._describe(self.shows[anime_id], (local_start + offset) % MINUTES_PER_WEEK)
+                for local_start, offset, anime_id in results]
+
+    @staticmethod
+    def _describe(anime: Anime, local: int) -> dict:
+        day, minute = divmod(local, MINUTES_PER_DAY)
+        return {
+            "id": anime.id,
+            "title": anime.title,
+            "day_of_the_week": WEEKDAYS[day].value,
+            "start_time": f"{minute // 60:02d}:{minute % 60:02d}",
+            "broadcast_jst": to_dict(anime.broadcast),
+            "media_type": to_dict(anime.media_type),
+            "status": to_dict(anime.status),
+            "num_episodes": anime.num_episodes,
+            "start_date": anime.start_date,
+        }
+
+
+class AiringSchedule:
+    """Keeps a ScheduleIndex of the current and previous season's airing shows.
+
+    The index is built on first use and then refreshed in the background every
+    `refresh_interval` seconds. A failed refresh keeps serving the old data.
+    """
+
+    def __init__(self, fetch_season: SeasonFetcher, refresh_interval: float = 6 * 3600):
+        self.fetch_season = fetch_season
+        self.refresh_interval = refresh_interval
+        self.index = ScheduleIndex()
+        self.refreshed_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    async def refresh(self) -> Optional[dict]:
+        """Fetches both seasons and applies the changes. Returns an error dict on failure."""
+        year, season = season_of(datetime.datetime.now(JST).date())
+        seasons = [(year, season), previous_season(year, season)]
+        results = await asyncio.gather(*(self.fetch_season(y, s) for y, s in seasons))
+        shows: Dict[int, Anime] = {}
+        for result in results:
+            if isinstance(result, dict):
+                return result
+            for entry in result:
+                anime = entry.node
+                if anime.status in (AnimeAiringStatus.AIRING, AnimeAiringStatus.NOT_YET_AIRED):
+                    shows[anime.id] = anime
+        self.index.update(shows)
+        self.refreshed_at = time.time()
+        return None
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            async with self._lock:
+                await self.refresh()
+
+    async def ensure_ready(self) -> Optional[dict]:
+        if self.refreshed_at is None:
+            async with self._lock:
+                if self.refreshed_at is None:
+                    error = await self.refresh()
+                    if error is not None:
+                        return error
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._refresh_loop())
+        return None
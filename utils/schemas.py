@@ -56,4 +56,53 @@ class MangaStatusSort(Enum):
     LIST_SCORE = "list_score"
     LIST_UPDATED_AT = "list_updated_at"
     MANGA_TITLE = "manga_title"
-    MANGA_START_DATE = "manga_start_date"
\ No newline at end of file
+    MANGA_START_DATE = "manga_start_date"
+
+class AnimeMediaType(Enum):
+    UNKNOWN = "unknown"
+    TV = "tv"
+    OVA = "ova"
+    MOVIE = "movie"
+    SPECIAL = "special"
+    ONA = "ona"
+    MUSIC = "music"
+    TV_SPECIAL = "tv_special"
+    CM = "cm"
+    PV = "pv"
+
+class AnimeAiringStatus(Enum):
+    FINISHED = "finished_airing"
+    AIRING = "currently_airing"
+    NOT_YET_AIRED = "not_yet_aired"
+
+class MangaMediaType(Enum):
+    UNKNOWN = "unknown"
+    MANGA = "manga"
+    NOVEL = "novel"
+    ONE_SHOT = "one_shot"
+    DOUJINSHI = "doujinshi"
+    MANHWA = "manhwa"
+    MANHUA = "manhua"
+    OEL = "oel"
+    LIGHT_NOVEL = "light_novel"
+
+class MangaPublishingStatus(Enum):
+    FINISHED = "finished"
+    PUBLISHING = "currently_publishing"
+    NOT_YET_PUBLISHED = "not_yet_published"
+    ON_HIATUS = "on_hiatus"
+    DISCONTINUED = "discontinued"
+
+class Weekday(Enum):
+    MONDAY = "monday"
+    TUESDAY = "tuesday"
+    WEDNESDAY = "wednesday"
+    THURSDAY = "thursday"
+    FRIDAY = "friday"
+    SATURDAY = "saturday"
+    SUNDAY = "sunday"
+    OTHER = "other"
+
+class CatalogueSort(Enum):
+    MEAN = "mean"
+    POPULARITY = "popularity"
@@ -0,0 +1,308 @@
+"""Host-wide response cache shared by every server process on the machine.
+
+Each MCP client session spawns its own stdio server, so an in-process cache
+only helps one session. When MAL_CACHE_SOCKET is set, the servers talk to a
+small cache daemon over that Unix socket instead. The daemon hands out a
+lease for each missing key: the first process to ask fetches it upstream and
+everyone else waits for the result, so the fleet makes one request per key.
+
+The daemon is spawned on demand (`python -m utils.shared_cache <socket>`) and
+exits after a period without clients. If it can't be reached the servers fall
+back to their in-process cache.
+
+Only sockets owned by the current user are trusted or removed, and daemon
+startup is serialised with a lock file next to the socket.
+"""
+import asyncio
+import fcntl
+import itertools
+import json
+import os
+import stat
+import subprocess
+import sys
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Set
+
+from utils.models import to_dict
+from utils.pipeline import Call, Handler, ResponseCache
+
+STREAM_LIMIT = 2 ** 24
+LEASE_TIMEOUT = 30.0
+RECONNECT_INTERVAL = 30.0
+
+
+def _owned_socket(path: str) -> bool:
+    """True if `path` is a Unix socket owned by the current user."""
+    try:
+        info = os.lstat(path)
+    except FileNotFoundError:
+        return False
+    return stat.S_ISSOCK(info.st_mode) and info.st_uid == os.getuid()
+
+
+class CacheServer:
+    def __init__(self, maxsize: int = 8192, lease_timeout: float = LEASE_TIMEOUT):
+        self.maxsize = maxsize
+        self.lease_timeout = lease_timeout
+        self.clients = 0
+        self.idle_since = time.monotonic()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._leases: Dict[str, asyncio.Event] = {}
+
+    def _lookup(self, key: str) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    async def get(self, key: str, owned: Set[str]) -> dict:
+        while True:
+            entry = self._lookup(key)
+            if entry is not None:
+                return {"hit": True, "value": entry[2]}
+            lease = self._leases.get(key)
+            if lease is None:
+                self._leases[key] = asyncio.Event()
+                owned.add(key)
+                return {"hit": False}
+            try:
+                await asyncio.wait_for(lease.wait(), self.lease_timeout)
+            except asyncio.TimeoutError:
+                # The holder is stuck; let the next waiter try instead.
+                if self._leases.get(key) is lease:
+                    self.release(key)
+
+    def set(self, key: str, name: str, value: Any, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, name, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        self.release(key)
+
+    def release(self, key: str) -> None:
+        lease = self._leases.pop(key, None)
+        if lease is not None:
+            lease.set()
+
+    def invalidate(self, names: list) -> None:
+        for key in [k for k, entry in self._entries.items() if entry[1] in names]:
+            del self._entries[key]
+
+    async def dispatch(self, message: dict, owned: Set[str]) -> dict:
+        op = message["op"]
+        if op == "get":
+            return await self.get(message["key"], owned)
+        if op == "set":
+            owned.discard(message["key"])
+            self.set(message["key"], message["name"], message["value"], message["ttl"])
+        elif op == "release":
+            owned.discard(message["key"])
+            self.release(message["key"])
+        elif op == "invalidate":
+            self.invalidate(message["names"])
+        return {}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.clients += 1
+        owned: Set[str] = set()
+        tasks: Set[asyncio.Task] = set()
+
+        async def respond(message: dict) -> None:
+            reply = await self.dispatch(message, owned)
+            reply["id"] = message.get("id")
+            writer.write(json.dumps(reply).encode() + b"\n")
+            await writer.drain()
+
+        try:
+            while line := await reader.readline():
+                task = asyncio.create_task(respond(json.loads(line)))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            # A process that dies mid-fetch must not leave others waiting on it.
+            for key in owned:
+                self.release(key)
+            writer.close()
+            self.clients -= 1
+            self.idle_since = time.monotonic()
+
+    async def serve(self, socket_path: str, idle_timeout: float) -> None:
+        lock = os.open(socket_path + ".lock", os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW, 0o600)
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(lock)
+            return  # Another daemon is starting or already owns the socket.
+        try:
+            if os.path.lexists(socket_path):
+                if not _owned_socket(socket_path):
+                    raise PermissionError(f"{socket_path} exists and is not a socket owned by this user")
+                os.unlink(socket_path)  # Left behind by a daemon that died; we hold the lock.
+            server = await asyncio.start_unix_server(self.handle, socket_path, limit=STREAM_LIMIT)
+            os.chmod(socket_path, 0o600)
+            bound = os.lstat(socket_path).st_ino
+            async with server:
+                while not (self.clients == 0 and time.monotonic() - self.idle_since > idle_timeout):
+                    await asyncio.sleep(min(idle_timeout, 5.0))
+            try:
+                if os.lstat(socket_path).st_ino == bound:
+                    os.unlink(socket_path)
+            except FileNotFoundError:
+                pass
+        finally:
+            os.close(lock)
+
+
+class _Connection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._writer = writer
+        self._ids = itertools.count()
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._reader_task = asyncio.create_task(self._read_loop(reader))
+
+    @property
+    def closed(self) -> bool:
+        return self._reader_task.done()
+
+    async def _read_loop(self, reader: asyncio.StreamReader) -> None:
+        try:
+            while line := await reader.readline():
+                reply = json.loads(line)
+                future = self._pending.pop(reply.pop("id"), None)
+                if future is not None and not future.done():
+                    future.set_result(reply)
+        finally:
+            self._writer.close()
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Shared cache connection closed"))
+            self._pending.clear()
+
+    async def request(self, message: dict, timeout: float) -> dict:
+        if self.closed:
+            raise ConnectionError("Shared cache connection closed")
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            self._writer.write(json.dumps({**message, "id": request_id}).encode() + b"\n")
+            await self._writer.drain()
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._pending.pop(request_id, None)
+
+
+class SharedCache:
+    """Cache middleware backed by the host-wide daemon, with an in-process fallback."""
+
+    def __init__(self, socket_path: str, fallback: ResponseCache, spawn: bool = True):
+        self.socket_path = socket_path
+        self.fallback = fallback
+        self.spawn = spawn
+        self._connection: Optional[_Connection] = None
+        self._retry_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def _open(self) -> _Connection:
+        if os.path.lexists(self.socket_path) and not _owned_socket(self.socket_path):
+            raise PermissionError(f"{self.socket_path} is not a socket owned by this user")
+        reader, writer = await asyncio.open_unix_connection(self.socket_path, limit=STREAM_LIMIT)
+        return _Connection(reader, writer)
+
+    def _spawn_daemon(self) -> None:
+        subprocess.Popen(
+            [sys.executable, "-m", "utils.shared_cache", self.socket_path],
+            cwd=Path(__file__).resolve().parent.parent,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True)
+
+    async def connection(self) -> Optional[_Connection]:
+        if self._connection is not None and not self._connection.closed:
+            return self._connection
+        if time.monotonic() < self._retry_at:
+            return None
+        async with self._lock:
+            if self._connection is not None and not self._connection.closed:
+                return self._connection
+            try:
+                self._connection = await self._open()
+            except PermissionError:
+                self._connection = None
+            except OSError:
+                self._connection = None
+                if self.spawn:
+                    self._spawn_daemon()
+                    for _ in range(20):
+                        await asyncio.sleep(0.05)
+                        try:
+                            self._connection = await self._open()
+                            break
+                        except OSError:
+                            continue
+            if self._connection is None:
+                self._retry_at = time.monotonic() + RECONNECT_INTERVAL
+            return self._connection
+
+    async def __call__(self, call: Call, call_next: Handler) -> Any:
+        connection = await self.connection()
+        if connection is None:
+            return await self.fallback(call, call_next)
+        endpoint = call.endpoint
+        if not (endpoint.ttl > 0 and endpoint.method == "GET"):
+            value = await call_next(call)
+            if endpoint.invalidates:
+                self.fallback.invalidate(endpoint.invalidates)
+                try:
+                    await connection.request({"op": "invalidate", "names": list(endpoint.invalidates)}, LEASE_TIMEOUT)
+                except (OSError, asyncio.TimeoutError):
+                    pass
+            return value
+
+        key = json.dumps(call.key)
+        try:
+            reply = await connection.request({"op": "get", "key": key}, LEASE_TIMEOUT + 5)
+        except (OSError, asyncio.TimeoutError):
+            return await self.fallback(call, call_next)
+        if reply.get("hit"):
+            call.meta["cache_hit"] = True
+            return endpoint.model(reply["value"]) if endpoint.model is not None else reply["value"]
+        try:
+            value = await call_next(call)
+        except BaseException:
+            try:
+                await connection.request({"op": "release", "key": key}, LEASE_TIMEOUT)
+            except (OSError, asyncio.TimeoutError):
+                pass
+            raise
+        try:
+            await connection.request(
+                {"op": "set", "key": key, "name": endpoint.name, "value": to_dict(value), "ttl": endpoint.ttl},
+                LEASE_TIMEOUT)
+        except (OSError, asyncio.TimeoutError):
+            pass
+        return value
+
+
+def main() -> None:
+    socket_path = sys.argv[1] if len(sys.argv) > 1 else os.getenv("MAL_CACHE_SOCKET")
+    if not socket_path:
+        sys.exit("usage: python -m utils.shared_cache <socket path>")
+    idle_timeout = float(os.getenv("MAL_CACHE_IDLE_TIMEOUT", "600"))
+    asyncio.run(CacheServer().serve(socket_path, idle_timeout))
+
+
+if __name__ == "__main__":
+    main()